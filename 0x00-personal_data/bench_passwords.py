@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark of batch password hashing and verification with a thread pool
+and with a process pool.
+
+Usage: ./bench_passwords.py [COUNT] [ROUNDS] [WORKERS]
+"""
+
+import os
+import sys
+import time
+
+from encrypt_password import hash_passwords, verify_passwords
+
+
+def main():
+    """
+    Hashes then verifies COUNT passwords with both kinds of pools.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+    passwords = [f"password{i}" for i in range(count)]
+
+    print(f"{count} passwords, {rounds} rounds, {workers} workers")
+    for name, use_processes in (("threads", False), ("processes", True)):
+        start = time.perf_counter()
+        hashes = hash_passwords(passwords, rounds, workers, use_processes)
+        hashed = time.perf_counter()
+        results = verify_passwords(zip(hashes, passwords), workers,
+                                   use_processes)
+        verified = time.perf_counter()
+        assert all(results)
+        # a malformed hash fails its own check, not the batch
+        results = verify_passwords([(hashes[0], passwords[0]),
+                                    (b"not a hash", passwords[0])],
+                                   workers, use_processes)
+        assert results == [True, False], results
+        print(f"{name:>9}: hash {count / (hashed - start):.1f}/s, "
+              f"verify {count / (verified - hashed):.1f}/s")
+
+
+if __name__ == "__main__":
+    main()
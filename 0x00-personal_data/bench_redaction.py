@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark of filter_datum against the precompiled Redactor on a large
+stream of log messages.
+"""
+
+import sys
+import time
+from typing import Callable, List
+
+from filtered_logger import PII_FIELDS, Redactor, filter_datum
+
+
+def make_messages(count: int) -> List[str]:
+    """
+    Builds `count` log lines shaped like the rows logged by main().
+    """
+    return [
+        "[HOLBERTON] user_data INFO 2019-11-19 18:24:25,105: "
+        f"name=user{i}; email=user{i}@example.com; phone=555-{i:04d}; "
+        f"ssn=000-00-{i:04d}; password=hash{i}; ip=10.0.{i % 256}.1; "
+        "last_login=2019-11-14T06:16:24; user_agent=Mozilla/5.0;"
+        for i in range(count)
+    ]
+
+
+def check(messages: List[str]):
+    """
+    Checks that Redactor redacts like filter_datum, with one-character and
+    multi-character separators.
+    """
+    cases = [(message, ";") for message in messages[:100]]
+    cases += [(message.replace(";", "; "), "; ") for message in messages[:100]]
+    cases.append(("name=Bob Smith; email=a@b; ", "; "))
+    for message, separator in cases:
+        redactor = Redactor(PII_FIELDS, "***", separator)
+        expected = filter_datum(PII_FIELDS, "***", message, separator)
+        assert redactor.redact(message) == expected, (message, separator)
+
+
+def run(name: str, redact: Callable[[str], str],
+        messages: List[str]) -> float:
+    """
+    Redacts every message and prints the throughput.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    size = sum(len(message) for message in messages)
+    start = time.perf_counter()
+    for message in messages:
+        redact(message)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>14}: {elapsed:.3f}s "
+          f"{len(messages) / elapsed:,.0f} msg/s "
+          f"{size / elapsed / 1e6:.1f} MB/s")
+    return elapsed
+
+
+def main():
+    """
+    Compares both redaction paths on the same messages.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    messages = make_messages(count)
+    check(messages)
+    redactor = Redactor(PII_FIELDS, "***", ";")
+
+    before = run("filter_datum",
+                 lambda m: filter_datum(PII_FIELDS, "***", m, ";"),
+                 messages)
+    after = run("Redactor", redactor.redact, messages)
+    print(f"speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,42 @@ Using the bcrypt package to hash passwords securely.
 """
 
 import bcrypt
+import os
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
+from typing import Callable, Iterable, List, Tuple
 
+DEFAULT_ROUNDS = 12
 
-def hash_password(password: str) -> bytes:
+
+def get_rounds() -> int:
+    """
+    Returns the bcrypt work factor of this deployment.
+
+    Returns:
+        int: BCRYPT_ROUNDS from the environment, or DEFAULT_ROUNDS.
+    """
+    try:
+        return int(os.getenv('BCRYPT_ROUNDS', DEFAULT_ROUNDS))
+    except ValueError:
+        return DEFAULT_ROUNDS
+
+
+def hash_password(password: str, rounds: int = None) -> bytes:
     """
     Hashes the given password using bcrypt with a salt.
 
     Args:
         password (str): The password to be hashed.
+        rounds (int): The bcrypt work factor, defaults to get_rounds().
 
     Returns:
         bytes: The salted and hashed password.
     """
+    if rounds is None:
+        rounds = get_rounds()
     # Generate a salt
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed_password
 
@@ -35,3 +57,103 @@ def is_valid(hashed_password: bytes, password: str) -> bool:
         False otherwise.
     """
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+
+def needs_rehash(hashed_password: bytes, rounds: int = None) -> bool:
+    """
+    Checks if a hash was made with another work factor than the current one.
+
+    Args:
+        hashed_password (bytes): A bcrypt hash ($2b$<rounds>$...).
+        rounds (int): The expected work factor, defaults to get_rounds().
+
+    Returns:
+        bool: True if the password should be hashed again.
+    """
+    if rounds is None:
+        rounds = get_rounds()
+    try:
+        return int(hashed_password.split(b"$")[2]) != rounds
+    except (IndexError, ValueError):
+        return True
+
+
+def hash_passwords(passwords: Iterable[str], rounds: int = None,
+                   workers: int = None, use_processes: bool = False,
+                   progress: Callable[[int, int], None] = None
+                   ) -> List[bytes]:
+    """
+    Hashes many passwords in parallel.
+
+    Args:
+        passwords (Iterable[str]): The passwords to be hashed.
+        rounds (int): The bcrypt work factor, defaults to get_rounds().
+        workers (int): Number of threads or processes, defaults to the
+        number of CPUs.
+        use_processes (bool): Use a process pool instead of threads.
+        bcrypt releases the GIL, so threads are usually enough.
+        progress (Callable[[int, int], None]): Called with (done, total)
+        after each hash.
+
+    Returns:
+        List[bytes]: The hashes, in the order of `passwords`.
+    """
+    if rounds is None:
+        rounds = get_rounds()
+    tasks = [(password, rounds) for password in passwords]
+    return _run_batch(hash_password, tasks, workers, use_processes,
+                      progress)
+
+
+def verify_passwords(pairs: Iterable[Tuple[bytes, str]],
+                     workers: int = None, use_processes: bool = False,
+                     progress: Callable[[int, int], None] = None
+                     ) -> List[bool]:
+    """
+    Validates many (hashed_password, password) pairs in parallel.
+
+    Args:
+        pairs (Iterable[Tuple[bytes, str]]): The arguments of is_valid.
+        workers (int): Number of threads or processes, defaults to the
+        number of CPUs.
+        use_processes (bool): Use a process pool instead of threads.
+        progress (Callable[[int, int], None]): Called with (done, total)
+        after each check.
+
+    Returns:
+        List[bool]: The result of is_valid for each pair, in input order.
+        A malformed hash (e.g. "Invalid salt") gives False instead of
+        failing the whole batch.
+    """
+    return _run_batch(_is_valid_or_false, list(pairs), workers,
+                      use_processes, progress)
+
+
+def _is_valid_or_false(hashed_password: bytes, password: str) -> bool:
+    """
+    is_valid, but False when bcrypt rejects the hash.
+    """
+    try:
+        return is_valid(hashed_password, password)
+    except ValueError:
+        return False
+
+
+def _run_batch(fn: Callable, tasks: List[tuple], workers: int,
+               use_processes: bool,
+               progress: Callable[[int, int], None]) -> list:
+    """
+    Runs fn(*task) for each task on a pool and returns the results in
+    the order of `tasks`.
+    """
+    executor_class = ProcessPoolExecutor if use_processes \
+        else ThreadPoolExecutor
+    results = [None] * len(tasks)
+    with executor_class(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(fn, *task): i
+                   for i, task in enumerate(tasks)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if progress is not None:
+                progress(done, len(tasks))
+    return results
@@ -3,10 +3,15 @@
 Module for handling Personal Data
 """
 
+import atexit
 import bcrypt
+import functools
 import logging
+import logging.handlers
+import queue
 import re
-from typing import List
+import sqlite3
+from typing import Iterable, Iterator, List, Sequence, Tuple
 import mysql.connector
 import os
 
@@ -30,6 +35,54 @@ def filter_datum(fields: List[str], redaction: str,
                   lambda m: f"{m.group(1)}={redaction}{separator}", message)
 
 
+class Redactor:
+    """
+    Redacts the values of given fields in `key=value<separator>` messages.
+
+    The pattern is compiled once, with escaped field names, and only matches
+    whole keys (at the start of the message or after a separator or
+    whitespace), so `username=` is not redacted for the field `name`.
+    Matching starts on `=` and checks the key with lookbehinds, which
+    keeps the replacement a constant string: no Python callback runs
+    per match.
+    """
+
+    def __init__(self, fields: Sequence[str], redaction: str = "***",
+                 separator: str = ";"):
+        self.fields = tuple(fields)
+        self.redaction = redaction
+        self.separator = separator
+        self._pattern = None
+        if self.fields:
+            sep = re.escape(separator)
+            keys = "|".join(rf'(?<=(?<![^\s{sep}]){re.escape(field)}=)'
+                            for field in self.fields)
+            # like filter_datum, a value never spans lines and ends at the
+            # first separator; a character class only works for a
+            # one-character separator
+            value = rf'[^{sep}\n]*' if len(separator) == 1 else r'[^\n]*?'
+            self._pattern = re.compile(rf'=(?:{keys}){value}{sep}')
+        self._replacement = f"={redaction}{separator}".replace('\\', '\\\\')
+
+    def redact(self, message: str) -> str:
+        """
+        Returns the message with the values of the fields redacted.
+        """
+        if self._pattern is None:
+            return message
+        return self._pattern.sub(self._replacement, message)
+
+
+@functools.lru_cache(maxsize=None)
+def get_redactor(fields: Sequence[str], redaction: str = "***",
+                 separator: str = ";") -> Redactor:
+    """
+    Returns a Redactor shared by all callers using the same (hashable)
+    fields, redaction and separator.
+    """
+    return Redactor(fields, redaction, separator)
+
+
 class RedactingFormatter(logging.Formatter):
     """ Redacting Formatter class
         """
@@ -41,11 +94,12 @@ class RedactingFormatter(logging.Formatter):
     def __init__(self, fields: List[str]):
         super(RedactingFormatter, self).__init__(self.FORMAT)
         self.fields = fields
+        self.redactor = get_redactor(tuple(fields), self.REDACTION,
+                                     self.SEPARATOR)
 
     def format(self, record: logging.LogRecord) -> str:
         message = super().format(record)
-        return filter_datum(self.fields, self.REDACTION,
-                            message, self.SEPARATOR)
+        return self.redactor.redact(message)
 
 
 PII_FIELDS = (
@@ -53,7 +107,7 @@ PII_FIELDS = (
     "email",
     "phone",
     "address",
-    "ssn"
+    "ssn",
     "password",
     "ip",
     "last_login",
@@ -61,32 +115,77 @@ PII_FIELDS = (
 )
 
 
-def get_logger() -> logging.Logger:
+_listener = None
+
+
+def get_logger(background: bool = None) -> logging.Logger:
     """
     Creates and configures a logger named 'user_data'.
 
+    The first call attaches the handler, later calls return the logger
+    as is, whatever `background` is.
+
+    Args:
+        background (bool): Redact and write records on a background thread
+        through a QueueHandler/QueueListener pair, instead of on the
+        caller's thread (USER_DATA_LOG_QUEUE, default off).
+
     Returns:
         logging.Logger: Configured logger.
     """
+    global _listener
+
     logger = logging.getLogger("user_data")
     logger.setLevel(logging.INFO)
     logger.propagate = False
+    if logger.handlers:
+        return logger
+
+    if background is None:
+        background = os.getenv('USER_DATA_LOG_QUEUE', '').lower() in \
+            ('1', 'true', 'yes')
 
     handler = logging.StreamHandler()
     formatter = RedactingFormatter(fields=PII_FIELDS)
     handler.setFormatter(formatter)
 
+    if background:
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, handler)
+        _listener.start()
+        atexit.register(shutdown_logger)
+        handler = logging.handlers.QueueHandler(log_queue)
+
     logger.addHandler(handler)
     return logger
 
 
+def shutdown_logger() -> None:
+    """
+    Writes the records still queued for the background thread and stops it.
+    Registered to run at exit when the logger runs in the background.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_db() -> mysql.connector.connection.MySQLConnection:
     """
     Establishes and returns a connection to the MySQL database.
 
+    When DB_SQLITE_PATH is set, a connection to that SQLite file is
+    returned instead, as a local stand-in for MySQL.
+
     Returns:
         mysql.connector.connection.MySQLConnection: Database connection object.
     """
+    sqlite_path = os.getenv('DB_SQLITE_PATH')
+    if sqlite_path:
+        return sqlite3.connect(sqlite_path)
+
     db_config = {
         'user': os.getenv('DB_USER'),
         'password': os.getenv('DB_PASSWORD'),
@@ -98,25 +197,63 @@ def get_db() -> mysql.connector.connection.MySQLConnection:
     return connection
 
 
-def main():
+def iter_rows(cursor, batch_size: int) -> Iterator[Tuple]:
+    """
+    Yields the rows of an executed query, fetching `batch_size` at a time.
+
+    With an unbuffered (server-side) cursor, at most one batch is held in
+    memory whatever the size of the result.
+    """
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def format_rows(columns: Sequence[str], rows: Iterable[Tuple],
+                separator: str = RedactingFormatter.SEPARATOR
+                ) -> Iterator[str]:
+    """
+    Yields one `key=value; ...` log message per row.
+
+    Every field, the last one included, ends with the separator so that
+    all of them can be redacted.
+    """
+    for row in rows:
+        yield " ".join(f"{key}={value}{separator}"
+                       for key, value in zip(columns, row))
+
+
+def main(batch_size: int = None):
     """
     Main function to retrieve and display users from the database.
+
+    Rows are streamed in batches of `batch_size` (EXPORT_BATCH_SIZE,
+    default 1000), so memory use doesn't grow with the table.
     """
+    if batch_size is None:
+        try:
+            batch_size = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+        except ValueError:
+            batch_size = 1000
     logger = get_logger()
     connection = get_db()
+    cursor = None
 
     try:
-        cursor = connection.cursor(dictionary=True)
+        cursor = connection.cursor()
         cursor.execute("SELECT * FROM users")
-        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
 
-        for row in rows:
-            message = "; ".join(f"{key}={value}" for key, value in row.items())
+        rows = iter_rows(cursor, batch_size)
+        for message in format_rows(columns, rows):
             logger.info(message)
-    except mysql.connector.Error as err:
+    except (mysql.connector.Error, sqlite3.Error) as err:
         logger.error(f"Error: {err}")
     finally:
-        cursor.close()
+        if cursor is not None:
+            cursor.close()
         connection.close()
 
 
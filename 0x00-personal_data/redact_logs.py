@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Redacts PII from log files in parallel, with the same fields and rules as
+RedactingFormatter.
+
+Usage: ./redact_logs.py INPUT [-o OUTPUT] [-w WORKERS] [-c CHUNK_MB]
+"""
+
+import argparse
+import collections
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from filtered_logger import PII_FIELDS, RedactingFormatter, get_redactor
+
+
+def split_lines(data: mmap.mmap, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits a mapped file into (start, end) chunks of about `chunk_size`
+    bytes, ending on line boundaries.
+    """
+    chunks = []
+    start = 0
+    size = len(data)
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = data.find(b"\n", end - 1)
+            end = size if newline == -1 else newline + 1
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def redact_chunk(task: Tuple[str, int, int]) -> bytes:
+    """
+    Redacts the bytes between `start` and `end` of a file.
+
+    Workers map the file themselves, so only offsets are sent to them.
+    """
+    file_path, start, end = task
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            text = data[start:end].decode('utf-8', 'surrogateescape')
+    redactor = get_redactor(PII_FIELDS, RedactingFormatter.REDACTION,
+                            RedactingFormatter.SEPARATOR)
+    return redactor.redact(text).encode('utf-8', 'surrogateescape')
+
+
+def redact_file(input_path: str, output, workers: int,
+                chunk_size: int) -> int:
+    """
+    Redacts `input_path` across `workers` processes and writes the result,
+    in order, to the binary stream `output`.
+
+    At most two chunks per worker are in flight, so memory use doesn't
+    depend on the size of the file.
+
+    Returns:
+        int: The number of bytes read.
+    """
+    size = os.path.getsize(input_path)
+    if size == 0:
+        return 0
+    with open(input_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            chunks = split_lines(data, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for start, end in chunks:
+            if len(pending) >= 2 * workers:
+                output.write(pending.popleft().result())
+            pending.append(executor.submit(redact_chunk,
+                                           (input_path, start, end)))
+        while pending:
+            output.write(pending.popleft().result())
+    return size
+
+
+def main():
+    """
+    Parses the command line, redacts the file and reports the throughput
+    on stderr.
+    """
+    parser = argparse.ArgumentParser(
+        description="Redact PII fields from a log file in parallel.")
+    parser.add_argument("input", help="log file to redact")
+    parser.add_argument("-o", "--output", default="-",
+                        help="redacted file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int,
+                        default=os.cpu_count() or 1,
+                        help="number of worker processes")
+    parser.add_argument("-c", "--chunk-mb", type=float, default=4,
+                        help="size of the chunks sent to workers, in MB")
+    args = parser.parse_args()
+
+    chunk_size = max(1, int(args.chunk_mb * 1024 * 1024))
+    start = time.perf_counter()
+    if args.output == "-":
+        size = redact_file(args.input, sys.stdout.buffer, args.workers,
+                           chunk_size)
+        sys.stdout.buffer.flush()
+    else:
+        with open(args.output, 'wb') as output:
+            size = redact_file(args.input, output, args.workers, chunk_size)
+    elapsed = time.perf_counter() - start
+
+    mb = size / 1e6
+    print(f"{mb:.1f} MB in {elapsed:.2f}s: {mb / elapsed:.1f} MB/s "
+          f"({args.workers} workers)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Route module for the API
 """
 from api.v1.views import app_views
 from api.v1.auth.auth import Auth
+from api.v1.auth.path_matcher import compile_paths
 from os import getenv
 from api.v1.views import app_views
 from flask import Flask, jsonify, abort, request
@@ -13,6 +14,8 @@ import importlib
 
 
 auth = None
+EXCLUDED_PATHS = compile_paths(('/api/v1/status/', '/api/v1/unauthorized/',
+                                '/api/v1/forbidden/'))
 
 app = Flask(__name__)
 app.register_blueprint(app_views)
@@ -53,15 +56,11 @@ def before_request():
     if auth is None:
         return
 
-    excluded_paths = ['/api/v1/status/', '/api/v1/unauthorized/',
-                      '/api/v1/forbidden/']
-
-    if request.path not in excluded_paths:
-        if auth.require_auth(request.path, excluded_paths):
-            if auth.authorization_header(request) is None:
-                abort(401)
-            if auth.current_user(request) is None:
-                abort(403)
+    if auth.require_auth(request.path, EXCLUDED_PATHS):
+        if auth.authorization_header(request) is None:
+            abort(401)
+        if auth.current_user(request) is None:
+            abort(403)
 
 
 if __name__ == "__main__":
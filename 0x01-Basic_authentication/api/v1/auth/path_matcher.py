@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Matcher of the paths excluded from authentication.
+"""
+from functools import lru_cache
+from typing import Iterable
+import fnmatch
+import re
+
+
+WILDCARDS = re.compile(r"[*?\[]")
+
+
+class PathMatcher:
+    """Set of fnmatch patterns compiled into one lookup.
+
+    Patterns without wildcards go in a set, the others are joined into a
+    single regex. Paths and plain patterns are compared with a trailing
+    slash, so `/api/v1/status` matches `/api/v1/status/`. Decisions are
+    cached per path.
+    """
+    def __init__(self, patterns: Iterable[str], cache_size: int = 4096):
+        """Compiles `patterns`, remembering the decisions for at most
+        `cache_size` paths.
+        """
+        self.patterns = tuple(patterns)
+        self.cache_size = cache_size
+        self._exact = set()
+        wildcards = []
+        for pattern in self.patterns:
+            if WILDCARDS.search(pattern):
+                wildcards.append(fnmatch.translate(pattern))
+            else:
+                self._exact.add(_with_slash(pattern))
+        self._regex = re.compile("|".join(wildcards)) if wildcards else None
+        self._decisions = {}
+
+    def __contains__(self, path: str) -> bool:
+        """Checks if a path matches one of the patterns.
+        """
+        decision = self._decisions.get(path)
+        if decision is None:
+            decision = self._match(path)
+            if len(self._decisions) >= self.cache_size:
+                self._decisions.clear()
+            self._decisions[path] = decision
+        return decision
+
+    def __len__(self) -> int:
+        """Number of patterns.
+        """
+        return len(self.patterns)
+
+    def _match(self, path: str) -> bool:
+        """Checks a path against the patterns, without the cache.
+        """
+        slashed = _with_slash(path)
+        if slashed in self._exact:
+            return True
+        if self._regex is None:
+            return False
+        return self._regex.match(path) is not None or \
+            self._regex.match(slashed) is not None
+
+
+@lru_cache(maxsize=32)
+def compile_paths(patterns: tuple) -> PathMatcher:
+    """Returns the matcher of a tuple of patterns, compiled once.
+    """
+    return PathMatcher(patterns)
+
+
+def _with_slash(path: str) -> str:
+    """Path with a trailing slash.
+    """
+    return path if path.endswith('/') else path + '/'
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+""" Convert the snapshot files of models to another format
+
+Usage: ./convert_snapshots.py FORMAT [CLASS ...]
+
+FORMAT is json, indexed or columnar. Each class (all by default) is
+loaded like the API does, from its current snapshot or .db_<class>.json,
+then written in FORMAT. Run the API with the same format afterwards,
+e.g. MODELS_SNAPSHOT_User=columnar.
+"""
+import sys
+
+from models.user import User
+
+
+CLASSES = {cls.__name__: cls for cls in (User,)}
+FORMATS = ("json", "indexed", "columnar")
+
+
+def convert(cls, snapshot_format: str):
+    """ Load the objects of a class and save them in `snapshot_format`
+    """
+    cls.load_from_file()
+    cls.SNAPSHOT_FORMAT = snapshot_format
+    cls.save_to_file()
+    print("{}: {} objects written to {}".format(
+        cls.__name__, cls.count(), cls._snapshot_path()))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in FORMATS or \
+            any(name not in CLASSES for name in sys.argv[2:]):
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        sys.exit(1)
+    for name in sys.argv[2:] or CLASSES:
+        convert(CLASSES[name], sys.argv[1])
@@ -1,20 +1,143 @@
 #!/usr/bin/env python3
 """ Base module
 """
-from datetime import datetime
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import TypeVar, List, Iterable
-from os import path
+from os import getenv, path
+from models.columnar_file import read_columnar_file, write_columnar_file
+from models.file_lock import FileLock
+from models.index import AttributeIndex, OrderedIndex
+from models.indexed_file import (Entry, LazyObjects, read_index,
+                                 write_indexed_file)
+from models.journal import Journal
+import atexit
 import json
+import os
+import threading
+import time
 import uuid
 
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+EPOCH = datetime(1970, 1, 1)
 DATA = {}
+INDEXES = {}
+JOURNALS = {}
+FILE_STAMPS = {}
+LOCKS = {}
+THREAD_LOCKS = {}
+# class name -> (class, {ID: object saved, or None if removed}) for the
+# changes not written yet in group commit mode
+PENDING = {}
+PENDING_LOCK = threading.Lock()
+
+
+def _file_stamp(file_path: str) -> tuple:
+    """ Identity of the current content of a file, None if it's missing
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def parse_timestamp(value: str) -> int:
+    """ Epoch seconds of a TIMESTAMP_FORMAT string
+    """
+    if len(value) == 19 and value[10] == 'T':
+        # fromisoformat parses this exact layout much faster than strptime
+        dt = datetime.fromisoformat(value)
+    else:
+        dt = datetime.strptime(value, TIMESTAMP_FORMAT)
+    return (dt - EPOCH) // timedelta(seconds=1)
+
+
+@lru_cache(maxsize=4096)
+def _format_date(days: int) -> str:
+    """ Date part of a timestamp, `days` days after the epoch
+    """
+    return (EPOCH + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def format_timestamp(seconds: int) -> str:
+    """ TIMESTAMP_FORMAT string of epoch seconds
+    """
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return "{}T{:02d}:{:02d}:{:02d}".format(_format_date(days), hours,
+                                            minutes, seconds)
+
+
+def _timestamp(value) -> int:
+    """ Epoch seconds of a TIMESTAMP_FORMAT string or of epoch seconds,
+    now if None
+    """
+    if value is None:
+        return int(time.time())
+    if type(value) is int:
+        return value
+    return parse_timestamp(value)
+
+
+def _fsync(file_path: str):
+    """ Flush a file or directory to disk
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def flush_all():
+    """ Write the pending changes of all classes
+    """
+    for cls, _ in list(PENDING.values()):
+        cls.flush()
+
+
+atexit.register(flush_all)
 
 
 class Base():
     """ Base class
+
+    Models declare their attributes in `__slots__`: objects have no
+    `__dict__`, and `created_at`/`updated_at` are stored as integer UTC
+    epoch seconds, exposed as naive UTC datetimes.
     """
+    __slots__ = ('id', '_created_at', '_updated_at')
+    # Attributes with an equality index used by `search`
+    INDEXED_ATTRIBUTES = ()
+    # "snapshot": every change rewrites .db_<class>.json
+    # "journal": every change is appended to .db_<class>.log, which is
+    # compacted into .db_<class>.json every JOURNAL_COMPACT_RECORDS records
+    STORAGE_MODE = getenv("MODELS_STORAGE", "snapshot")
+    JOURNAL_COMPACT_RECORDS = 1000
+    # "json": .db_<class>.json, a JSON dict parsed at once on load
+    # "indexed": .db_<class>.jsonl, one object per line and an index of
+    # their offsets; objects are parsed on first access
+    # "columnar": .db_<class>.col, binary arrays of attribute values and a
+    # table of the distinct strings
+    # MODELS_SNAPSHOT_<class> selects the format of one class
+    SNAPSHOT_FORMAT = getenv("MODELS_SNAPSHOT", "json")
+    # > 0: snapshot changes are written by a background thread at most
+    # every COMMIT_DELAY milliseconds instead of on every save, see `flush`
+    COMMIT_DELAY = int(getenv("MODELS_COMMIT_DELAY", "0"))
+    # "always": writes are fsync'ed before they return, "never": left to
+    # the OS
+    FSYNC = getenv("MODELS_FSYNC", "never")
+
+    def __init_subclass__(cls, **kwargs):
+        """ Apply the snapshot format chosen for the class
+        """
+        super().__init_subclass__(**kwargs)
+        cls.SNAPSHOT_FORMAT = getenv("MODELS_SNAPSHOT_{}".format(
+            cls.__name__), cls.SNAPSHOT_FORMAT)
 
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
@@ -22,18 +145,50 @@ class Base():
         s_class = str(self.__class__.__name__)
         if DATA.get(s_class) is None:
             DATA[s_class] = {}
+        if INDEXES.get(s_class) is None:
+            INDEXES[s_class] = self._new_indexes()
 
-        self.id = kwargs.get('id', str(uuid.uuid4()))
-        if kwargs.get('created_at') is not None:
-            self.created_at = datetime.strptime(kwargs.get('created_at'),
-                                                TIMESTAMP_FORMAT)
-        else:
-            self.created_at = datetime.utcnow()
-        if kwargs.get('updated_at') is not None:
-            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
-                                                TIMESTAMP_FORMAT)
-        else:
-            self.updated_at = datetime.utcnow()
+        # not kwargs.get('id', ...): a new UUID per loaded object is slow
+        self.id = kwargs['id'] if 'id' in kwargs else str(uuid.uuid4())
+        self._created_at = _timestamp(kwargs.get('created_at'))
+        self._updated_at = _timestamp(kwargs.get('updated_at'))
+
+    @property
+    def created_at(self) -> datetime:
+        """ Getter of the creation time
+        """
+        return EPOCH + timedelta(seconds=self._created_at)
+
+    @created_at.setter
+    def created_at(self, value: datetime):
+        """ Setter of the creation time, truncated to the second
+        """
+        self._created_at = int((value - EPOCH).total_seconds())
+
+    @property
+    def updated_at(self) -> datetime:
+        """ Getter of the last update time
+        """
+        return EPOCH + timedelta(seconds=self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value: datetime):
+        """ Setter of the last update time, truncated to the second
+        """
+        self._updated_at = int((value - EPOCH).total_seconds())
+
+    @classmethod
+    def _json_keys(cls) -> tuple:
+        """ Attributes serialized by `to_json`, in declaration order
+        """
+        keys = cls.__dict__.get('_JSON_KEYS')
+        if keys is None:
+            keys = ('id', 'created_at', 'updated_at')
+            for klass in reversed(cls.__mro__[:-1]):
+                if klass is not Base:
+                    keys += tuple(klass.__dict__.get('__slots__', ()))
+            cls._JSON_KEYS = keys
+        return keys
 
     def __eq__(self, other: TypeVar('Base')) -> bool:
         """ Equality
@@ -47,59 +202,429 @@ class Base():
     def to_json(self, for_serialization: bool = False) -> dict:
         """ Convert the object a JSON dictionary
         """
-        result = {}
-        for key, value in self.__dict__.items():
+        result = {'id': self.id,
+                  'created_at': format_timestamp(self._created_at),
+                  'updated_at': format_timestamp(self._updated_at)}
+        for key in self._json_keys()[3:]:
             if not for_serialization and key[0] == '_':
                 continue
+            value = getattr(self, key, None)
             if type(value) is datetime:
                 result[key] = value.strftime(TIMESTAMP_FORMAT)
             else:
                 result[key] = value
         return result
 
+    @classmethod
+    def _new_indexes(cls) -> dict:
+        """ Empty indexes of the class: INDEXED_ATTRIBUTES, and IDs in
+        order for `page`
+        """
+        indexes = {attr: AttributeIndex(attr)
+                   for attr in cls.INDEXED_ATTRIBUTES}
+        indexes['id'] = OrderedIndex()
+        return indexes
+
     @classmethod
     def load_from_file(cls):
         """ Load all objects from file
+
+        The objects and their indexes are built aside then swapped in, so
+        `get` and `search` in other threads never see them half loaded.
         """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        DATA[s_class] = {}
-        if not path.exists(file_path):
-            return
+        file_path = cls._snapshot_path()
+        # writers of other threads of the process hold the thread lock,
+        # PENDING_LOCK or the lock of the journal below: their changes are
+        # either in what is read here or made to the objects swapped in.
+        # Snapshots are replaced atomically, so other processes are only
+        # waited for in journal mode: a compaction holds the file lock
+        # from the rotation of the log to the removal of the rotated log.
+        file_lock = cls._file_lock() if cls.STORAGE_MODE == "journal" \
+            else nullcontext()
+        with cls._thread_lock(), file_lock:
+            stamp = _file_stamp(file_path)
+            objs = {}
+            indexes = cls._new_indexes()
+            if cls.SNAPSHOT_FORMAT == "indexed" and path.exists(file_path):
+                objs = cls._load_indexed(file_path, indexes)
+            elif cls.SNAPSHOT_FORMAT == "columnar" and path.exists(file_path):
+                cls._load_columnar(file_path, objs, indexes)
+            elif path.exists(".db_{}.json".format(s_class)):
+                # also used to convert a JSON file to another format
+                with open(".db_{}.json".format(s_class), 'r') as f:
+                    objs_json = json.load(f)
+                    for obj_json in objs_json.values():
+                        cls._put(objs, indexes, cls(**obj_json))
 
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+            if cls.STORAGE_MODE != "journal":
+                cls._swap(objs, indexes, stamp)
+                return
+            journal = cls._journal()
+            with journal.lock:
+                records = 0
+                for record in journal.replay():
+                    cls._apply(record, objs, indexes)
+                    records += 1
+                journal.records = records
+                cls._swap(objs, indexes, stamp)
 
     @classmethod
-    def save_to_file(cls):
-        """ Save all objects to file
+    def _swap(cls, objs: dict, indexes: dict, stamp: tuple):
+        """ Replace the loaded objects and indexes by newly loaded ones,
+        with the changes not written yet
         """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
+        with PENDING_LOCK:
+            cls._apply_pending(objs, indexes)
+            DATA[s_class] = objs
+            INDEXES[s_class] = indexes
+            FILE_STAMPS[s_class] = stamp
+
+    @classmethod
+    def _load_indexed(cls, file_path: str, indexes: dict) -> LazyObjects:
+        """ Load the index of an indexed file into `indexes`, leaving the
+        objects in it to be parsed on first access
+        """
+        attributes, entries = read_index(file_path)
+        objs = LazyObjects(cls, file_path, entries)
+        if list(attributes) != list(cls.INDEXED_ATTRIBUTES):
+            # indexed values in the file are outdated
+            for obj in objs.values():
+                for index in indexes.values():
+                    index.add(obj)
+            return objs
+        attribute_indexes = [indexes[attr] for attr in attributes]
+        for obj_id, _, _, values in entries:
+            for index, value in zip(attribute_indexes, values):
+                index.add_value(obj_id, value)
+        return objs
+
+    @classmethod
+    def _load_columnar(cls, file_path: str, objs: dict, indexes: dict):
+        """ Load all objects from a columnar file into `objs` and `indexes`
+        """
+        names, columns = read_columnar_file(file_path)
+        for values in zip(*columns):
+            cls._put(objs, indexes, cls(**dict(zip(names, values))))
+
+    @staticmethod
+    def _put(objs: dict, indexes: dict, obj: TypeVar('Base')):
+        """ Add or replace an object in `objs` and in `indexes`
+        """
+        objs[obj.id] = obj
+        for index in indexes.values():
+            index.add(obj)
+
+    @staticmethod
+    def _drop(objs: dict, indexes: dict, obj_id: str):
+        """ Remove an object from `objs` and from `indexes`
+        """
+        objs.pop(obj_id, None)
+        for index in indexes.values():
+            index.discard(obj_id)
+
+    def _values(self) -> list:
+        """ Values of the attributes serialized by `to_json`, with epoch
+        seconds as timestamps
+        """
+        values = [self.id, self._created_at, self._updated_at]
+        values.extend([getattr(self, key, None)
+                       for key in self._json_keys()[3:]])
+        return values
+
+    @classmethod
+    def _snapshot_path(cls) -> str:
+        """ Path of the snapshot file of the class
+        """
+        if cls.SNAPSHOT_FORMAT == "indexed":
+            return ".db_{}.jsonl".format(cls.__name__)
+        if cls.SNAPSHOT_FORMAT == "columnar":
+            return ".db_{}.col".format(cls.__name__)
+        return ".db_{}.json".format(cls.__name__)
+
+    @classmethod
+    def _snapshot_items(cls) -> tuple:
+        """ Return the (ID, object) pairs to write a snapshot, with objects
+        not parsed yet left as is, and the function reading those
+        """
+        objs = DATA[cls.__name__]
+        if isinstance(objs, LazyObjects):
+            return objs.raw_items(), objs.read
+        return list(objs.items()), None
+
+    @classmethod
+    def _write_snapshot(cls, file_path: str, items: list, read=None):
+        """ Write (ID, object) pairs to a snapshot file
+        """
+        if cls.SNAPSHOT_FORMAT == "indexed":
+            write_indexed_file(file_path, items, cls.INDEXED_ATTRIBUTES,
+                               read)
+            return
+        if read is not None:
+            # converting an indexed file: parse the objects left in it
+            items = [(obj_id, cls(**json.loads(read(obj)))
+                      if type(obj) is Entry else obj)
+                     for obj_id, obj in items]
+        if cls.SNAPSHOT_FORMAT == "columnar":
+            rows = [obj._values() for _, obj in items]
+            keys = cls._json_keys()
+            columns = [list(column) for column in zip(*rows)] if rows \
+                else [[] for _ in keys]
+            write_columnar_file(file_path, keys, columns)
+            return
+
         objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
+        for obj_id, obj in items:
             objs_json[obj_id] = obj.to_json(True)
-
         with open(file_path, 'w') as f:
             json.dump(objs_json, f)
 
+    @classmethod
+    def _replace_snapshot(cls, file_path: str, items: list, read=None):
+        """ Write a snapshot to a temporary file then move it over
+        `file_path`, so readers see either the old or the new snapshot
+        """
+        tmp_path = "{}.{}.{}.tmp".format(file_path, os.getpid(),
+                                         threading.get_ident())
+        try:
+            cls._write_snapshot(tmp_path, items, read)
+            if cls.FSYNC == "always":
+                _fsync(tmp_path)
+            os.replace(tmp_path, file_path)
+            if cls.FSYNC == "always":
+                _fsync(path.dirname(path.abspath(file_path)))
+        except BaseException:
+            if path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def refresh_from_file(cls):
+        """ Load objects from file only if the files changed since they
+        were last read or written by this process
+        """
+        s_class = cls.__name__
+        file_path = cls._snapshot_path()
+        if DATA.get(s_class) is None or \
+                FILE_STAMPS.get(s_class) != _file_stamp(file_path):
+            cls.load_from_file()
+            return
+        if cls.STORAGE_MODE != "journal":
+            return
+
+        journal = cls._journal()
+        if journal.replaced():
+            cls.load_from_file()
+            return
+        if not journal.grown():
+            return
+        for record in journal.replay_new():
+            cls._apply(record, DATA[s_class], INDEXES[s_class])
+
+    @classmethod
+    def _apply(cls, record: dict, objs: dict, indexes: dict):
+        """ Apply a journal record to `objs` and `indexes`
+        """
+        if record.get('op') == "save":
+            cls._put(objs, indexes, cls(**record['obj']))
+        elif record.get('op') == "remove":
+            cls._drop(objs, indexes, record['id'])
+
+    @classmethod
+    def save_to_file(cls):
+        """ Save all objects to file
+        """
+        if cls.STORAGE_MODE == "journal":
+            cls._compact()
+            return
+
+        s_class = cls.__name__
+        file_path = cls._snapshot_path()
+        with cls._file_lock():
+            cls._replace_snapshot(file_path, *cls._snapshot_items())
+            FILE_STAMPS[s_class] = _file_stamp(file_path)
+
+    @classmethod
+    def _file_lock(cls) -> FileLock:
+        """ Return the lock held by the processes writing the files of the
+        class
+        """
+        s_class = cls.__name__
+        if LOCKS.get(s_class) is None:
+            LOCKS[s_class] = FileLock(".db_{}.lock".format(s_class))
+        return LOCKS[s_class]
+
+    @classmethod
+    def _thread_lock(cls) -> threading.RLock:
+        """ Return the lock held by the threads of this process loading the
+        objects of the class or writing them, before the file lock
+        """
+        return THREAD_LOCKS.setdefault(cls.__name__, threading.RLock())
+
+    @classmethod
+    def _journal(cls) -> Journal:
+        """ Return the journal of the class
+        """
+        s_class = cls.__name__
+        if JOURNALS.get(s_class) is None:
+            JOURNALS[s_class] = Journal(".db_{}.log".format(s_class),
+                                        cls.JOURNAL_COMPACT_RECORDS,
+                                        cls.FSYNC == "always")
+        return JOURNALS[s_class]
+
+    @classmethod
+    def _log(cls, record: dict):
+        """ Append a record to the journal, compacting it in the
+        background when it gets long
+        """
+        journal = cls._journal()
+        journal.append(record)
+        if journal.reserve_compaction():
+            threading.Thread(target=cls._compact, daemon=True).start()
+
+    @classmethod
+    def _compact(cls):
+        """ Write a snapshot of all objects and drop the journal records
+        it contains
+        """
+        s_class = cls.__name__
+        file_path = cls._snapshot_path()
+        journal = cls._journal()
+        with journal.compaction_lock, cls._thread_lock(), \
+                cls._file_lock():
+            # records appended by other processes are only in the log:
+            # they're loaded before it's rotated, and the file lock keeps
+            # other compactions and loads out until the rotated log is
+            # dropped
+            cls.refresh_from_file()
+            with journal.lock:
+                for record in journal.rotate():
+                    cls._apply(record, DATA[s_class], INDEXES[s_class])
+                items, read = cls._snapshot_items()
+            cls._replace_snapshot(file_path, items, read)
+            FILE_STAMPS[s_class] = _file_stamp(file_path)
+            journal.compacted()
+
     def save(self):
         """ Save current object
         """
-        s_class = self.__class__.__name__
-        self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        cls = self.__class__
+        s_class = cls.__name__
+        self._updated_at = int(time.time())
+        if cls.STORAGE_MODE == "journal":
+            # under the lock of the journal, so a load doesn't swap the
+            # objects between the change and its record
+            with cls._journal().lock:
+                DATA[s_class][self.id] = self
+                self._index()
+                cls._log({'op': "save", 'obj': self.to_json(True)})
+            return
+        if cls.COMMIT_DELAY > 0:
+            with PENDING_LOCK:
+                DATA[s_class][self.id] = self
+                self._index()
+                cls._defer({self.id: self})
+            return
+
+        with cls._thread_lock(), cls._file_lock():
+            # objects saved by other processes since the last load must
+            # not be overwritten
+            cls.refresh_from_file()
+            DATA[s_class][self.id] = self
+            self._index()
+            cls.save_to_file()
 
     def remove(self):
         """ Remove object
         """
+        self.__class__.remove_many([self])
+
+    @classmethod
+    def remove_many(cls, objs: Iterable[TypeVar('Base')]):
+        """ Remove objects, writing the file once for all of them
+        """
+        if cls.STORAGE_MODE == "journal":
+            with cls._journal().lock:
+                for obj_id in cls._discard(objs):
+                    cls._log({'op': "remove", 'id': obj_id})
+            return
+        if cls.COMMIT_DELAY > 0:
+            with PENDING_LOCK:
+                cls._defer({obj_id: None for obj_id in cls._discard(objs)})
+            return
+
+        with cls._thread_lock(), cls._file_lock():
+            cls.refresh_from_file()
+            if len(cls._discard(objs)) > 0:
+                cls.save_to_file()
+
+    @classmethod
+    def _defer(cls, changes: dict):
+        """ Add changes to the ones written by the next flush, scheduled
+        COMMIT_DELAY milliseconds after the first of them; PENDING_LOCK
+        must be held
+        """
+        s_class = cls.__name__
+        if s_class not in PENDING:
+            PENDING[s_class] = (cls, {})
+            timer = threading.Timer(cls.COMMIT_DELAY / 1000, cls.flush)
+            timer.daemon = True
+            timer.start()
+        PENDING[s_class][1].update(changes)
+
+    @classmethod
+    def _apply_pending(cls, objs: dict, indexes: dict):
+        """ Apply the changes not written yet to `objs` and `indexes`;
+        PENDING_LOCK must be held
+        """
+        s_class = cls.__name__
+        if s_class not in PENDING:
+            return
+        for obj_id, obj in PENDING[s_class][1].items():
+            if obj is None:
+                cls._drop(objs, indexes, obj_id)
+            else:
+                cls._put(objs, indexes, obj)
+
+    @classmethod
+    def flush(cls):
+        """ Write the changes not written yet in group commit mode, with
+        the changes of other processes; durable when it returns if FSYNC
+        is "always"
+        """
+        s_class = cls.__name__
+        if s_class not in PENDING:
+            return
+        with cls._thread_lock(), cls._file_lock():
+            # reloading the file applies the pending changes again
+            cls.refresh_from_file()
+            with PENDING_LOCK:
+                if PENDING.pop(s_class, None) is None:
+                    return
+            cls.save_to_file()
+
+    @classmethod
+    def _discard(cls, objs: Iterable[TypeVar('Base')]) -> List[str]:
+        """ Remove objects from the loaded ones and return their IDs
+        """
+        s_class = cls.__name__
+        removed_ids = []
+        for obj in objs:
+            if DATA[s_class].get(obj.id) is None:
+                continue
+            del DATA[s_class][obj.id]
+            for index in INDEXES[s_class].values():
+                index.discard(obj.id)
+            removed_ids.append(obj.id)
+        return removed_ids
+
+    def _index(self):
+        """ Refresh index entries of the current object
+        """
         s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        for index in INDEXES[s_class].values():
+            index.add(self)
 
     @classmethod
     def count(cls) -> int:
@@ -114,6 +639,24 @@ class Base():
         """
         return cls.search()
 
+    @classmethod
+    def page(cls, limit: int, after: str = None) -> List[TypeVar('Base')]:
+        """ Return up to `limit` objects with an ID greater than `after`,
+        ordered by ID
+        """
+        s_class = cls.__name__
+        objs = DATA[s_class]
+        index = INDEXES[s_class]['id']
+        page = []
+        while len(page) < limit:
+            ids = index.page(objs.keys(), limit - len(page), after)
+            if len(ids) == 0:
+                break
+            # objects removed by another thread may still be indexed
+            page.extend(obj for obj in map(objs.get, ids) if obj is not None)
+            after = ids[-1]
+        return page
+
     @classmethod
     def get(cls, id: str) -> TypeVar('Base'):
         """ Return one object by ID
@@ -124,8 +667,24 @@ class Base():
     @classmethod
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
+
+        Indexed attributes narrow the candidates to a dict lookup,
+        other attributes are checked by scanning these candidates
         """
         s_class = cls.__name__
+        candidates = None
+        indexes = INDEXES.get(s_class, {})
+        for k, v in attributes.items():
+            if indexes.get(k) is None:
+                continue
+            ids = indexes[k].lookup(v)
+            if ids is None:
+                continue
+            if candidates is None:
+                candidates = ids
+            else:
+                candidates = {i: None for i in candidates if i in ids}
+
         def _search(obj):
             if len(attributes) == 0:
                 return True
@@ -133,5 +692,10 @@ class Base():
                 if (getattr(obj, k) != v):
                     return False
             return True
-        
-        return list(filter(_search, DATA[s_class].values()))
+
+        if candidates is None:
+            objs = DATA[s_class].values()
+        else:
+            objs = [DATA[s_class][i] for i in candidates
+                    if i in DATA[s_class]]
+        return list(filter(_search, objs))
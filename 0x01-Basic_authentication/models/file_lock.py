@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+""" File lock module
+"""
+import fcntl
+import os
+import threading
+
+
+class FileLock():
+    """ Exclusive advisory lock (flock) on a file, shared by the processes
+    and the threads of a process, and reentrant
+    """
+
+    def __init__(self, file_path: str):
+        """ Initialize a lock on `file_path`, created on first use
+        """
+        self.file_path = file_path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+        self._pid = None
+
+    def __enter__(self):
+        """ Wait for the lock
+        """
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                if self._pid != os.getpid():
+                    # a forked process would share its parent's lock
+                    self._fd = os.open(self.file_path,
+                                       os.O_RDWR | os.O_CREAT, 0o644)
+                    self._pid = os.getpid()
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        """ Release the lock
+        """
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+""" Index module
+"""
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional, TypeVar
+
+
+class AttributeIndex():
+    """ Equality index of one attribute: attribute value -> object IDs
+    """
+
+    def __init__(self, attribute: str):
+        """ Initialize an empty index on `attribute`
+        """
+        self.attribute = attribute
+        self._ids_by_value = {}
+        self._value_by_id = {}
+        self._unhashable = {}
+
+    def add(self, obj: TypeVar('Base')):
+        """ Index the current value of `attribute` on `obj`
+        """
+        self.add_value(obj.id, getattr(obj, self.attribute, None))
+
+    def add_value(self, obj_id: str, value):
+        """ Index `value` as the value of `attribute` for `obj_id`
+        """
+        self.discard(obj_id)
+        try:
+            ids = self._ids_by_value.setdefault(value, {})
+        except TypeError:
+            self._unhashable[obj_id] = None
+            return
+        ids[obj_id] = None
+        self._value_by_id[obj_id] = value
+
+    def discard(self, obj_id: str):
+        """ Remove `obj_id` from the index
+        """
+        self._unhashable.pop(obj_id, None)
+        if obj_id not in self._value_by_id:
+            return
+        value = self._value_by_id.pop(obj_id)
+        ids = self._ids_by_value[value]
+        del ids[obj_id]
+        if len(ids) == 0:
+            del self._ids_by_value[value]
+
+    def lookup(self, value) -> Optional[dict]:
+        """ Return the IDs (as an ordered dict) that may match `value`,
+        or None if `value` can't be looked up in the index
+        """
+        try:
+            ids = self._ids_by_value.get(value)
+        except TypeError:
+            return None
+        if len(self._unhashable) == 0:
+            return ids if ids is not None else {}
+        candidates = dict(ids) if ids is not None else {}
+        candidates.update(self._unhashable)
+        return candidates
+
+    def clear(self):
+        """ Remove all entries
+        """
+        self._ids_by_value.clear()
+        self._value_by_id.clear()
+        self._unhashable.clear()
+
+
+class OrderedIndex():
+    """ Object IDs in sorted order, for cursor pagination
+
+    The sorted list is only built on the first `page`, then kept up to
+    date by `add` and `discard`
+    """
+    def __init__(self):
+        """ Initialize an index not built yet
+        """
+        self._ids = None
+
+    def add(self, obj: TypeVar('Base')):
+        """ Insert the ID of `obj`
+        """
+        if self._ids is None:
+            return
+        i = bisect_left(self._ids, obj.id)
+        if i == len(self._ids) or self._ids[i] != obj.id:
+            self._ids.insert(i, obj.id)
+
+    def discard(self, obj_id: str):
+        """ Remove `obj_id` from the index
+        """
+        if self._ids is None:
+            return
+        i = bisect_left(self._ids, obj_id)
+        if i < len(self._ids) and self._ids[i] == obj_id:
+            del self._ids[i]
+
+    def lookup(self, value) -> Optional[dict]:
+        """ Return the IDs equal to `value`; pagination only keeps track
+        of present IDs once built, so None (scan) until then
+        """
+        if self._ids is None or type(value) is not str:
+            return None
+        i = bisect_left(self._ids, value)
+        if i < len(self._ids) and self._ids[i] == value:
+            return {value: None}
+        return {}
+
+    def page(self, all_ids: Iterable[str], limit: int,
+             after: str = None) -> List[str]:
+        """ Return up to `limit` IDs greater than `after`, in order;
+        `all_ids` builds the index on first use
+        """
+        if self._ids is None:
+            self._ids = sorted(all_ids)
+        start = 0 if after is None else bisect_right(self._ids, after)
+        return self._ids[start:start + limit]
+
+    def clear(self):
+        """ Remove all entries
+        """
+        self._ids = None
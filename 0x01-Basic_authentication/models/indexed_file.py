@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+""" Indexed file module
+
+Layout of an indexed snapshot file:
+    one JSON object per line
+    one JSON line: {"attributes": [...], "entries": [[id, offset, length,
+                    [values of the attributes]], ...]}
+    the offset of the index line, as 20 digits and a newline
+
+Objects are only parsed when first accessed; the index also carries the
+values of the indexed attributes so `search` can be served without
+parsing the objects.
+"""
+from collections.abc import MutableMapping
+from typing import Callable, Iterator, List, Sequence, Tuple
+import json
+import os
+
+
+TRAILER_SIZE = 21
+
+
+class Entry(tuple):
+    """ Position of an object not parsed yet: (offset, length, values)
+    """
+
+
+class LazyObjects(MutableMapping):
+    """ Objects by ID, parsed from an indexed file on first access
+    """
+
+    def __init__(self, factory: Callable, file_path: str,
+                 entries: List[list]):
+        """ Initialize from the index `entries` of `file_path`;
+        `factory(**json)` builds an object
+        """
+        self._factory = factory
+        self._file = open(file_path, 'rb')
+        self._objs = {obj_id: Entry((offset, length, values))
+                      for obj_id, offset, length, values in entries}
+
+    def __getitem__(self, obj_id: str):
+        """ Return an object, parsing it if needed
+        """
+        obj = self._objs[obj_id]
+        if type(obj) is Entry:
+            obj = self._factory(**json.loads(self.read(obj)))
+            self._objs[obj_id] = obj
+        return obj
+
+    def __setitem__(self, obj_id: str, obj):
+        """ Set an object
+        """
+        self._objs[obj_id] = obj
+
+    def __delitem__(self, obj_id: str):
+        """ Remove an object
+        """
+        del self._objs[obj_id]
+
+    def __iter__(self) -> Iterator[str]:
+        """ Iterate over the IDs
+        """
+        return iter(self._objs)
+
+    def __len__(self) -> int:
+        """ Number of objects
+        """
+        return len(self._objs)
+
+    def __contains__(self, obj_id) -> bool:
+        """ Check an ID without parsing its object
+        """
+        return obj_id in self._objs
+
+    def raw_items(self) -> List[tuple]:
+        """ Return (ID, object or Entry) pairs without parsing objects
+        """
+        return list(self._objs.items())
+
+    def read(self, entry: Entry) -> bytes:
+        """ Return the JSON line of an entry
+        """
+        offset, length, _ = entry
+        return os.pread(self._file.fileno(), length, offset)
+
+
+def read_index(file_path: str) -> Tuple[List[str], List[list]]:
+    """ Return the attributes and entries of the index of `file_path`
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(-TRAILER_SIZE, os.SEEK_END)
+        index_offset = int(f.read(TRAILER_SIZE))
+        f.seek(index_offset)
+        index = json.loads(f.readline())
+    return index['attributes'], index['entries']
+
+
+def write_indexed_file(file_path: str, items: Sequence[tuple],
+                       attributes: Sequence[str],
+                       read: Callable[[Entry], bytes] = None) -> List[list]:
+    """ Write (ID, object or Entry) pairs to `file_path`, copying the
+    lines of entries with `read`, and return the new index entries
+    """
+    entries = []
+    with open(file_path, 'wb') as f:
+        offset = 0
+        for obj_id, obj in items:
+            if type(obj) is Entry:
+                line = read(obj)
+                values = obj[2]
+            else:
+                line = "{}\n".format(json.dumps(obj.to_json(True))).encode()
+                values = [getattr(obj, attr, None) for attr in attributes]
+            f.write(line)
+            entries.append([obj_id, offset, len(line), values])
+            offset += len(line)
+        index = {'attributes': list(attributes), 'entries': entries}
+        f.write("{}\n".format(json.dumps(index)).encode())
+        f.write("{:020d}\n".format(offset).encode())
+    return entries
@@ -2,22 +2,25 @@
 """Authentication module.
 """
 
+from api.v1.auth.path_matcher import compile_paths, PathMatcher
 from flask import request
-from typing import List, TypeVar
-import fnmatch
+from typing import List, TypeVar, Union
+import os
 
 
 class Auth:
     """Authentication class.
     """
-    def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
+    def require_auth(self, path: str,
+                     excluded_paths: Union[List[str], PathMatcher]) -> bool:
         """
         Method to check if authentication is required.
 
         Args:
             path (str): The path to check.
-            excluded_paths (List[str]): A list of paths that do not
-            require authentication.
+            excluded_paths (List[str]): A list of paths (fnmatch patterns)
+            that do not require authentication, or a PathMatcher compiled
+            from them.
 
         Returns:
             bool: True if authentication is required, False otherwise.
@@ -25,14 +28,12 @@ class Auth:
         if path is None:
             return True
 
-        if excluded_paths is None or not excluded_paths:
+        if excluded_paths is None or len(excluded_paths) == 0:
             return True
 
-        for excluded_path in excluded_paths:
-            if fnmatch.fnmatch(path, excluded_path):
-                return False
-
-        return True
+        if not isinstance(excluded_paths, PathMatcher):
+            excluded_paths = compile_paths(tuple(excluded_paths))
+        return path not in excluded_paths
 
     def authorization_header(self, request=None) -> str:
         """
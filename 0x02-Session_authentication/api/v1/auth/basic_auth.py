@@ -4,16 +4,31 @@
 import re
 import base64
 import binascii
+from os import getenv
 from typing import Tuple, TypeVar
 
 
 from .auth import Auth
+from .credential_cache import CredentialCache
 from models.user import User
 
 
 class BasicAuth(Auth):
     """Basic authentication class.
     """
+    def __init__(self):
+        """Initializes the cache of verified credentials.
+        """
+        try:
+            cache_size = int(getenv('BASIC_AUTH_CACHE_SIZE', '1024'))
+        except ValueError:
+            cache_size = 1024
+        try:
+            cache_ttl = float(getenv('BASIC_AUTH_CACHE_TTL', '300'))
+        except ValueError:
+            cache_ttl = 300
+        self.credential_cache = CredentialCache(cache_size, cache_ttl)
+
     def extract_base64_authorization_header(
             self,
             authorization_header: str) -> str:
@@ -79,11 +94,36 @@ class BasicAuth(Auth):
                 return users[0]
         return None
 
+    def cached_user(self, authorization_header: str) -> TypeVar('User'):
+        """Retrieves the user already verified for an Authorization header,
+        as long as its email and password didn't change since.
+        """
+        cached = self.credential_cache.get(authorization_header)
+        if cached is None:
+            return None
+        user_id, email, password_hash = cached
+        try:
+            user = User.get(user_id)
+        except Exception:
+            user = None
+        if user is None or user.email != email or \
+                user.password != password_hash:
+            self.credential_cache.discard(authorization_header)
+            return None
+        return user
+
     def current_user(self, request=None) -> TypeVar('User'):
         """Retrieves the user from a request.
         """
         auth_header = self.authorization_header(request)
+        user = self.cached_user(auth_header)
+        if user is not None:
+            return user
         b64_auth_token = self.extract_base64_authorization_header(auth_header)
         auth_token = self.decode_base64_authorization_header(b64_auth_token)
         email, password = self.extract_user_credentials(auth_token)
-        return self.user_object_from_credentials(email, password)
+        user = self.user_object_from_credentials(email, password)
+        if user is not None:
+            self.credential_cache.put(auth_header,
+                                      (user.id, user.email, user.password))
+        return user
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Cache of verified credentials for the API.
+"""
+from collections import OrderedDict
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+
+class CredentialCache:
+    """Bounded LRU cache with expiration, keyed by Authorization header.
+
+    Headers are stored as a keyed digest (HMAC with a per-process secret),
+    never in clear, since they contain the user's password.
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        """Initializes an empty cache of at most `max_size` entries
+        kept for `ttl` seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._secret = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, authorization_header: str) -> bytes:
+        """Keyed digest of an Authorization header.
+        """
+        return hmac.new(self._secret, authorization_header.encode('utf-8'),
+                        hashlib.sha256).digest()
+
+    def get(self, authorization_header: str):
+        """Returns the value cached for a header, None if missing or
+        expired.
+        """
+        if self.max_size <= 0 or type(authorization_header) != str:
+            return None
+        key = self._key(authorization_header)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, authorization_header: str, value) -> None:
+        """Caches a value for a header, evicting the least recently
+        used entry when full.
+        """
+        if self.max_size <= 0 or type(authorization_header) != str:
+            return
+        key = self._key(authorization_header)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, authorization_header: str) -> None:
+        """Removes the value cached for a header.
+        """
+        if type(authorization_header) != str:
+            return
+        key = self._key(authorization_header)
+        with self._lock:
+            self._entries.pop(key, None)
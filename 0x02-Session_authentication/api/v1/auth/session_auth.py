@@ -2,13 +2,24 @@
 """ Module of Session Authentication
 """
 from api.v1.auth.auth import Auth
+from api.v1.auth.session_store import open_session_store
 from models.user import User
+import time
 import uuid
 
 
 class SessionAuth(Auth):
     """Session Authentication Class"""
     user_id_by_session_id = {}
+    # Store used when SESSION_STORE is unset, see open_session_store
+    SESSION_STORE = "memory"
+    session_duration = 0
+
+    def __init__(self):
+        """Constructor Method"""
+        self.store = open_session_store(self.SESSION_STORE,
+                                        self.user_id_by_session_id,
+                                        self.session_duration)
 
     def create_session(self, user_id: str = None) -> str:
         """Creates a Session ID for a user_id"""
@@ -18,17 +29,23 @@ class SessionAuth(Auth):
 
         session_id = str(uuid.uuid4())
 
-        self.user_id_by_session_id[session_id] = user_id
+        self.store.set(session_id, user_id, self.new_session_expires_at())
 
         return session_id
 
+    def new_session_expires_at(self) -> float:
+        """Expiration time of a new session in epoch seconds, None if
+        sessions don't expire
+        """
+        return None
+
     def user_id_for_session_id(self, session_id: str = None) -> str:
         """Returns a User ID based on a Session ID"""
 
         if session_id is None or not isinstance(session_id, str):
             return None
 
-        return self.user_id_by_session_id.get(session_id)
+        return self.store.get(session_id, time.time())
 
     def current_user(self, request=None):
         """Returns a User instance based on a cookie value"""
@@ -57,9 +74,6 @@ class SessionAuth(Auth):
         if not user_id:
             return False
 
-        try:
-            del self.user_id_by_session_id[session_id]
-        except Exception:
-            pass
+        self.store.delete(session_id)
 
         return True
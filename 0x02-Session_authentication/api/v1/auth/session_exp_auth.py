@@ -2,13 +2,18 @@
 """ Module of Expiration of Session Authentication
 """
 from api.v1.auth.session_auth import SessionAuth
-from datetime import datetime, timedelta
-from models.user import User
 from os import getenv
+import threading
+import time
 
 
 class SessionExpAuth(SessionAuth):
     """Session Expiration Class"""
+    # Expired sessions evicted by a lookup
+    SWEEP_LIMIT = 100
+    # Seconds between two sweeps by lookups of a process, so lookups
+    # don't all take the write lock of a shared store
+    SWEEP_EVERY = 1.0
 
     def __init__(self):
         """Constructor Method"""
@@ -20,23 +25,24 @@ class SessionExpAuth(SessionAuth):
             session_duration = 0
 
         self.session_duration = session_duration
+        self._next_sweep = 0.0
+        super().__init__()
 
-    def create_session(self, user_id=None):
-        """Creation session with expiration"""
+        try:
+            sweep_interval = float(getenv('SESSION_SWEEP_INTERVAL'))
+        except Exception:
+            sweep_interval = 0
 
-        session_id = super().create_session(user_id)
+        if self.session_duration > 0 and sweep_interval > 0:
+            sweeper = threading.Thread(target=self._sweep_forever,
+                                       args=(sweep_interval,), daemon=True)
+            sweeper.start()
 
-        if session_id is None:
+    def new_session_expires_at(self):
+        """Expiration time of a new session"""
+        if self.session_duration <= 0:
             return None
-
-        session_dictionary = {
-            "user_id": user_id,
-            "created_at": datetime.now()
-        }
-
-        self.user_id_by_session_id[session_id] = session_dictionary
-
-        return session_id
+        return time.time() + self.session_duration
 
     def user_id_for_session_id(self, session_id=None):
         """gets user_id from session_id"""
@@ -44,25 +50,25 @@ class SessionExpAuth(SessionAuth):
         if session_id is None:
             return None
 
-        if session_id not in self.user_id_by_session_id.keys():
-            return None
+        now = time.time()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.SWEEP_EVERY
+            self.sweep_expired_sessions(self.SWEEP_LIMIT)
 
-        session_dictionary = self.user_id_by_session_id.get(session_id)
-
-        if session_dictionary is None:
-            return None
+        return super().user_id_for_session_id(session_id)
 
+    def sweep_expired_sessions(self, limit=None):
+        """Evicts the sessions expired by now, at most `limit` of them"""
         if self.session_duration <= 0:
-            return session_dictionary.get('user_id')
-
-        created_at = session_dictionary.get('created_at')
-
-        if created_at is None:
-            return None
-
-        expired_time = created_at + timedelta(seconds=self.session_duration)
-
-        if expired_time < datetime.now():
-            return None
-
-        return session_dictionary.get('user_id')
+            return 0
+
+        return len(self.store.pop_expired(time.time(), limit))
+
+    def _sweep_forever(self, interval):
+        """Evicts expired sessions every `interval` seconds"""
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep_expired_sessions()
+            except Exception:
+                pass
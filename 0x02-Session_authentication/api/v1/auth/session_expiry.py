@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+""" Module of Session expiration scheduling
+"""
+from typing import Iterable, List, Tuple
+import heapq
+import threading
+
+
+class SessionExpiry:
+    """Sessions ordered by expiration time (epoch seconds)
+
+    Sessions destroyed before they expire stay in the heap and are
+    returned by `pop_expired` anyway: evicting them again is a no-op.
+    """
+
+    def __init__(self):
+        """Constructor Method"""
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of scheduled sessions"""
+        return len(self._heap)
+
+    def schedule(self, session_id: str, expires_at: float):
+        """Schedules the eviction of a session"""
+        with self._lock:
+            heapq.heappush(self._heap, (expires_at, session_id))
+
+    def reset(self, entries: Iterable[Tuple[float, str]]):
+        """Replaces all scheduled sessions by (expires_at, session_id)
+        entries
+        """
+        heap = list(entries)
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap = heap
+
+    def pop_expired(self, now: float, limit: int = None) -> List[str]:
+        """Removes and returns the sessions expired at `now`, at most
+        `limit` of them
+        """
+        session_ids = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < now:
+                if limit is not None and len(session_ids) >= limit:
+                    break
+                session_ids.append(heapq.heappop(self._heap)[1])
+        return session_ids
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+""" Module of Session stores
+
+A store maps session IDs to user IDs with an optional expiration time
+(epoch seconds). SESSION_STORE selects the implementation:
+    memory: a dict, sessions only live in the current process
+    model: UserSession objects saved by the models (.db_UserSession.json)
+    sqlite: a SQLite database in WAL mode, shared by the processes
+    shm: a hash table in shared memory, shared by the processes
+"""
+from api.v1.auth.session_expiry import SessionExpiry
+from datetime import timezone
+from models.base import DATA
+from models.user_session import UserSession
+from os import getenv
+from typing import List
+import threading
+
+
+class SessionStore:
+    """Interface of the session stores"""
+
+    def set(self, session_id: str, user_id: str, expires_at: float = None):
+        """Stores a session, expiring at `expires_at` if not None"""
+        raise NotImplementedError()
+
+    def get(self, session_id: str, now: float) -> str:
+        """Returns the user ID of a session, None if it's missing or
+        expired at `now`
+        """
+        raise NotImplementedError()
+
+    def delete(self, session_id: str) -> bool:
+        """Deletes a session, returns False if it's missing"""
+        raise NotImplementedError()
+
+    def pop_expired(self, now: float, limit: int = None) -> List[str]:
+        """Deletes and returns the sessions expired at `now`, at most
+        `limit` of them
+        """
+        raise NotImplementedError()
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in dicts of the current process"""
+
+    def __init__(self, user_ids: dict = None):
+        """Constructor Method, `user_ids` maps session IDs to user IDs"""
+        self.user_ids = {} if user_ids is None else user_ids
+        self._expires_at = {}
+        self._expiry = SessionExpiry()
+
+    def set(self, session_id, user_id, expires_at=None):
+        """Stores a session"""
+        self.user_ids[session_id] = user_id
+        if expires_at is None:
+            self._expires_at.pop(session_id, None)
+        else:
+            self._expires_at[session_id] = expires_at
+            self._expiry.schedule(session_id, expires_at)
+
+    def get(self, session_id, now):
+        """Returns the user ID of a session"""
+        expires_at = self._expires_at.get(session_id)
+        if expires_at is not None and expires_at < now:
+            return None
+        return self.user_ids.get(session_id)
+
+    def delete(self, session_id):
+        """Deletes a session"""
+        self._expires_at.pop(session_id, None)
+        return self.user_ids.pop(session_id, None) is not None
+
+    def pop_expired(self, now, limit=None):
+        """Deletes and returns the expired sessions"""
+        session_ids = []
+        for session_id in self._expiry.pop_expired(now, limit):
+            expires_at = self._expires_at.get(session_id)
+            # sessions deleted or set again stay in the schedule
+            if expires_at is not None and expires_at < now:
+                self.delete(session_id)
+                session_ids.append(session_id)
+        return session_ids
+
+
+class ModelSessionStore(SessionStore):
+    """Sessions saved as UserSession objects
+
+    UserSession has no expiration time: sessions expire
+    `session_duration` seconds after their creation, never if it's 0.
+    """
+
+    def __init__(self, session_duration: int = 0):
+        """Constructor Method"""
+        self.session_duration = session_duration
+        self._expiry = SessionExpiry()
+        self._scheduled_sessions = None
+        self._lock = threading.Lock()
+
+    def set(self, session_id, user_id, expires_at=None):
+        """Saves a UserSession"""
+        user_session = UserSession(user_id=user_id, session_id=session_id)
+        user_session.save()
+        if self.session_duration > 0:
+            self._expiry.schedule(session_id,
+                                  self._expires_at(user_session))
+
+    def get(self, session_id, now):
+        """Returns the user ID of a UserSession"""
+        user_session = self._find(session_id)
+        if user_session is None:
+            return None
+        if self.session_duration > 0 and \
+                self._expires_at(user_session) < now:
+            return None
+        return user_session.user_id
+
+    def delete(self, session_id):
+        """Removes a UserSession"""
+        user_session = self._find(session_id)
+        if user_session is None:
+            return False
+        user_session.remove()
+        return True
+
+    def pop_expired(self, now, limit=None):
+        """Removes and returns the expired UserSessions
+
+        When the sessions are reloaded from file, the schedule is rebuilt
+        from them so sessions created by other processes expire too.
+        """
+        if self.session_duration <= 0:
+            return []
+
+        with self._lock:
+            user_sessions = DATA.get(UserSession.__name__)
+            if user_sessions is not None and \
+                    user_sessions is not self._scheduled_sessions:
+                self._scheduled_sessions = user_sessions
+                self._expiry.reset(
+                    (self._expires_at(user_session), user_session.session_id)
+                    for user_session in UserSession.all()
+                )
+
+        expired = []
+        for session_id in self._expiry.pop_expired(now, limit):
+            expired.extend(UserSession.search({'session_id': session_id}))
+        UserSession.remove_many(expired)
+        return [user_session.session_id for user_session in expired]
+
+    def _find(self, session_id):
+        """UserSession of a session ID, None if it's missing"""
+        UserSession.refresh_from_file()
+        user_sessions = UserSession.search({'session_id': session_id})
+        return user_sessions[0] if user_sessions else None
+
+    def _expires_at(self, user_session) -> float:
+        """Expiration time of a UserSession in epoch seconds"""
+        created_at = user_session.created_at.replace(tzinfo=timezone.utc)
+        return created_at.timestamp() + self.session_duration
+
+
+def open_session_store(default: str = "memory", user_ids: dict = None,
+                       session_duration: int = 0) -> SessionStore:
+    """Opens the store named by SESSION_STORE, `default` if it's unset
+
+    `user_ids` backs the memory store, `session_duration` is the lifetime
+    of the sessions of the model store.
+    """
+    kind = getenv("SESSION_STORE", default)
+    if kind == "memory":
+        return MemorySessionStore(user_ids)
+    if kind == "model":
+        return ModelSessionStore(session_duration)
+    if kind == "sqlite":
+        from api.v1.auth.sqlite_session_store import SQLiteSessionStore
+        return SQLiteSessionStore(
+            getenv("SESSION_SQLITE_PATH", ".db_sessions.sqlite3"))
+    if kind == "shm":
+        from api.v1.auth.shm_session_store import SharedMemorySessionStore
+        return SharedMemorySessionStore(
+            getenv("SESSION_SHM_PATH", "/dev/shm/api_sessions"),
+            int(getenv("SESSION_SHM_SLOTS", "65536")))
+    raise ValueError("Unknown session store: {}".format(kind))
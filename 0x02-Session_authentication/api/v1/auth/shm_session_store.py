@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+""" Module of Session store in shared memory
+"""
+from api.v1.auth.session_store import SessionStore
+from contextlib import contextmanager
+import fcntl
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+
+# magic, slot size, slots, used slots, deleted slots
+HEADER = struct.Struct("<4sIQQQ")
+COUNTS = struct.Struct("<QQ")
+# used and deleted slots, after the magic, the slot size and the slots
+COUNTS_OFFSET = 16
+MAGIC = b"SES2"
+# state, expires_at, session_id, user_id
+SLOT = struct.Struct("<Bd64s64s")
+EMPTY, USED, DELETED = 0, 1, 2
+# slots checked by a sweep with a limit
+SWEEP_SLOTS = 1024
+# the table is rebuilt without its deleted slots when they are more than
+# this fraction of the slots
+MAX_DELETED = 0.25
+
+
+class SharedMemorySessionStore(SessionStore):
+    """Sessions in an open addressing hash table in a memory mapped file
+
+    With a file in /dev/shm, the table lives in shared memory: every
+    process maps the same pages, and a session is found by hashing its
+    ID and probing the next slots. Writers take an exclusive flock on the
+    file, readers a shared one. Session and user IDs are at most 64
+    bytes.
+
+    The table doesn't grow: it holds at most `slots` sessions. Deleted
+    slots are kept as tombstones on the probe paths until they are too
+    many, then the table is rebuilt in place. When it's full, expired
+    sessions are dropped; if none are, `set` raises MemoryError.
+    """
+
+    def __init__(self, file_path: str, slots: int = 65536):
+        """Constructor Method, creates the table with `slots` slots if the
+        file doesn't exist; an existing table keeps its size
+        """
+        self.file_path = file_path
+        self._fd = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        with self._locked(exclusive=True):
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, HEADER.size + slots * SLOT.size)
+                os.pwrite(self._fd,
+                          HEADER.pack(MAGIC, SLOT.size, slots, 0, 0), 0)
+            magic, slot_size, slots, _, _ = HEADER.unpack(
+                os.pread(self._fd, HEADER.size, 0))
+            if magic != MAGIC or slot_size != SLOT.size:
+                raise ValueError("Not a session table: {}".format(file_path))
+        self.slots = slots
+        self._map = mmap.mmap(self._fd, HEADER.size + slots * SLOT.size)
+        self._cursor = 0
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False):
+        """Holds the lock of the threads and the lock of the processes"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # a forked process shares the flock of its parent's file
+                self._fd = os.open(self.file_path, os.O_RDWR)
+                self._pid = os.getpid()
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive
+                        else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, i: int) -> int:
+        """Offset of slot `i`"""
+        return HEADER.size + i * SLOT.size
+
+    def _find(self, key: bytes) -> tuple:
+        """Returns (slot of `key` or None, first free slot on its path
+        or None)
+        """
+        free = None
+        i = zlib.crc32(key) % self.slots
+        for _ in range(self.slots):
+            offset = self._offset(i)
+            state = self._map[offset]
+            if state == EMPTY:
+                return None, i if free is None else free
+            if state == DELETED:
+                if free is None:
+                    free = i
+            elif self._map[offset + 9:offset + 73] == key:
+                return i, free
+            i = (i + 1) % self.slots
+        return None, free
+
+    def _counts(self) -> tuple:
+        """Returns the numbers of used and of deleted slots"""
+        return COUNTS.unpack_from(self._map, COUNTS_OFFSET)
+
+    def _count(self, used: int = 0, deleted: int = 0):
+        """Adds to the numbers of used and of deleted slots"""
+        counts = self._counts()
+        COUNTS.pack_into(self._map, COUNTS_OFFSET, counts[0] + used,
+                         counts[1] + deleted)
+
+    def _free(self, i: int):
+        """Frees slot `i`; slots before an empty slot end no probe path,
+        so they become empty instead of deleted
+        """
+        following = self._map[self._offset((i + 1) % self.slots)]
+        state = EMPTY if following == EMPTY else DELETED
+        self._count(used=-1)
+        while True:
+            self._map[self._offset(i)] = state
+            if state == DELETED:
+                self._count(deleted=1)
+                return
+            i = (i - 1) % self.slots
+            if self._map[self._offset(i)] != DELETED:
+                return
+            self._count(deleted=-1)
+
+    def _rebuild(self, now: float):
+        """Inserts the sessions not expired at `now` again in an empty
+        table, dropping the deleted slots; the exclusive lock must be held
+        """
+        sessions = []
+        for i in range(self.slots):
+            if self._map[self._offset(i)] == USED and \
+                    not self._expired(i, now):
+                sessions.append(SLOT.unpack_from(self._map,
+                                                 self._offset(i)))
+        self._map[HEADER.size:] = bytes(self.slots * SLOT.size)
+        COUNTS.pack_into(self._map, COUNTS_OFFSET, len(sessions), 0)
+        for session in sessions:
+            _, free = self._find(session[2])
+            SLOT.pack_into(self._map, self._offset(free), *session)
+
+    def set(self, session_id, user_id, expires_at=None):
+        """Stores a session"""
+        key = _pack_id(session_id)
+        value = _pack_id(user_id)
+        if expires_at is None:
+            expires_at = math.inf
+        with self._locked(exclusive=True):
+            i, free = self._find(key)
+            if i is None and free is None:
+                self._rebuild(time.time())
+                i, free = self._find(key)
+            if i is None:
+                i = free
+            if i is None:
+                raise MemoryError("Session table is full")
+            state = self._map[self._offset(i)]
+            if state != USED:
+                self._count(used=1, deleted=-1 if state == DELETED else 0)
+            SLOT.pack_into(self._map, self._offset(i), USED, expires_at,
+                           key, value)
+            if self._counts()[1] > self.slots * MAX_DELETED:
+                self._rebuild(time.time())
+
+    def get(self, session_id, now):
+        """Returns the user ID of a session"""
+        try:
+            key = _pack_id(session_id)
+        except ValueError:
+            # not an ID given by `set`, e.g. a forged cookie
+            return None
+        with self._locked():
+            i, _ = self._find(key)
+            if i is None:
+                return None
+            _, expires_at, _, user_id = SLOT.unpack_from(self._map,
+                                                         self._offset(i))
+        if expires_at < now:
+            return None
+        return user_id.rstrip(b"\0").decode('utf-8')
+
+    def delete(self, session_id):
+        """Deletes a session"""
+        try:
+            key = _pack_id(session_id)
+        except ValueError:
+            return False
+        with self._locked(exclusive=True):
+            i, _ = self._find(key)
+            if i is None:
+                return False
+            self._free(i)
+        return True
+
+    def pop_expired(self, now, limit=None):
+        """Deletes and returns the expired sessions
+
+        With a limit, only the next SWEEP_SLOTS slots are checked, from
+        where the previous sweep stopped. The slots are checked under the
+        shared lock: lookups of other processes only wait for the
+        exclusive lock when there are expired sessions to delete.
+        """
+        expired = []
+        count = self.slots if limit is None else min(SWEEP_SLOTS,
+                                                     self.slots)
+        with self._locked():
+            i = self._cursor
+            for _ in range(count):
+                if limit is not None and len(expired) >= limit:
+                    break
+                if self._expired(i, now):
+                    expired.append(i)
+                i = (i + 1) % self.slots
+            self._cursor = i
+        if not expired:
+            return []
+
+        session_ids = []
+        with self._locked(exclusive=True):
+            for i in expired:
+                # the slot may have changed since it was checked
+                if self._expired(i, now):
+                    key = SLOT.unpack_from(self._map, self._offset(i))[2]
+                    self._free(i)
+                    session_ids.append(key.rstrip(b"\0").decode('utf-8'))
+        return session_ids
+
+    def _expired(self, i: int, now: float) -> bool:
+        """Returns True if slot `i` holds a session expired at `now`"""
+        offset = self._offset(i)
+        if self._map[offset] != USED:
+            return False
+        return SLOT.unpack_from(self._map, offset)[1] < now
+
+
+def _pack_id(value: str) -> bytes:
+    """ID as a slot field, padded with NUL bytes"""
+    data = value.encode('utf-8')
+    if len(data) > 64 or b"\0" in data:
+        raise ValueError("Invalid ID: {!r}".format(value))
+    return data.ljust(64, b"\0")
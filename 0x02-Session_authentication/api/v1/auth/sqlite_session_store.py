@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+""" Module of Session store in SQLite
+"""
+from api.v1.auth.session_store import SessionStore
+import os
+import sqlite3
+import threading
+
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " session_id TEXT PRIMARY KEY,"
+    " user_id TEXT NOT NULL,"
+    " expires_at REAL"
+    ") WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS sessions_expires_at"
+    " ON sessions (expires_at) WHERE expires_at IS NOT NULL",
+)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a SQLite database shared by the processes
+
+    The database is in WAL mode so lookups don't wait for writes; session
+    IDs are the primary key and expiration times are indexed, so lookups
+    and sweeps are B-tree searches. Each thread of each process opens its
+    own connection.
+    """
+
+    def __init__(self, file_path: str, timeout: float = 5):
+        """Constructor Method, creates the database if needed"""
+        self.file_path = file_path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connection() as connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the current thread"""
+        connection = getattr(self._local, 'connection', None)
+        # connections can't be used by a forked process
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.file_path,
+                                         timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def set(self, session_id, user_id, expires_at=None):
+        """Stores a session"""
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                (session_id, user_id, expires_at))
+
+    def get(self, session_id, now):
+        """Returns the user ID of a session"""
+        row = self._connection().execute(
+            "SELECT user_id FROM sessions WHERE session_id = ?"
+            " AND (expires_at IS NULL OR expires_at >= ?)",
+            (session_id, now)).fetchone()
+        return row[0] if row is not None else None
+
+    def delete(self, session_id):
+        """Deletes a session"""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def pop_expired(self, now, limit=None):
+        """Deletes and returns the expired sessions
+
+        Readers don't wait for writers in WAL mode: the write transaction
+        is only started when there are expired sessions to delete.
+        """
+        with self._connection() as connection:
+            if connection.execute(
+                    "SELECT 1 FROM sessions WHERE expires_at < ? LIMIT 1",
+                    (now,)).fetchone() is None:
+                return []
+            rows = connection.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                " SELECT session_id FROM sessions WHERE expires_at < ?"
+                " ORDER BY expires_at LIMIT ?) RETURNING session_id",
+                (now, -1 if limit is None else limit)).fetchall()
+        return [row[0] for row in rows]
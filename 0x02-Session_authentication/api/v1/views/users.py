@@ -2,18 +2,73 @@
 """ Module of Users views
 """
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from flask import (abort, jsonify, request, Response, stream_with_context,
+                   url_for)
 from models.user import User
+import json
+
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_PAGE_SIZE = 100
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters (optional):
+      - limit: maximum number of User objects, ordered by ID
+      - after: ID of the last User object of the previous page
     Return:
-      - list of all User objects JSON represented
+      - list of User objects JSON represented, all of them without
+        `limit`; a `Link` header gives the next page if there is one
+      - one User object JSON represented per line if the request
+        accepts application/x-ndjson, streamed page by page
+      - 400 if `limit` isn't a positive integer
+    """
+    limit = request.args.get('limit')
+    after = request.args.get('after')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return jsonify({'error': "Wrong limit"}), 400
+
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return Response(stream_with_context(_stream_users(limit, after)),
+                        mimetype=NDJSON_MIMETYPE)
+
+    if limit is None and after is None:
+        all_users = [user.to_json() for user in User.all()]
+        return jsonify(all_users)
+
+    if limit is None:
+        limit = User.count()
+    users = User.page(limit + 1, after)
+    response = jsonify([user.to_json() for user in users[:limit]])
+    if len(users) > limit:
+        next_url = url_for('app_views.view_all_users', limit=limit,
+                           after=users[limit - 1].id)
+        response.headers['Link'] = '<{}>; rel="next"'.format(next_url)
+    return response
+
+
+def _stream_users(limit: int = None, after: str = None):
+    """ Yield up to `limit` User objects after `after` as JSON lines,
+    without holding more than a page of them
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    while limit is None or limit > 0:
+        size = STREAM_PAGE_SIZE if limit is None \
+            else min(limit, STREAM_PAGE_SIZE)
+        users = User.page(size, after)
+        for user in users:
+            yield "{}\n".format(json.dumps(user.to_json()))
+        if len(users) < size:
+            return
+        after = users[-1].id
+        if limit is not None:
+            limit -= size
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
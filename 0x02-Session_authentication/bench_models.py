@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+""" Benchmarks of the models
+
+Usage: python3 bench_models.py [COUNT]
+
+Fails if the timestamp fast paths are slower than strptime/strftime.
+"""
+from datetime import datetime
+import os
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+import uuid
+
+from models.base import (DATA, EPOCH, TIMESTAMP_FORMAT, format_timestamp,
+                         parse_timestamp)
+from models.user import User
+from models.user_session import UserSession
+
+
+class DictUser():
+    """ User as stored before slots: a __dict__ and two datetimes
+    """
+
+    def __init__(self, **kwargs):
+        """ Initialize like User
+        """
+        self.id = kwargs.get('id', str(uuid.uuid4()))
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
+        self.email = kwargs.get('email')
+        self._password = kwargs.get('_password')
+        self.first_name = kwargs.get('first_name')
+        self.last_name = kwargs.get('last_name')
+
+
+class DictUserSession():
+    """ UserSession as stored before slots
+    """
+
+    def __init__(self, **kwargs):
+        """ Initialize like UserSession
+        """
+        self.id = kwargs.get('id', str(uuid.uuid4()))
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
+        self.user_id = kwargs.get('user_id')
+        self.session_id = kwargs.get('session_id')
+
+
+def bytes_per_object(factory, count: int) -> float:
+    """ Average memory allocated by `factory()`, excluding the attribute
+    values shared with the other benchmarks
+    """
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objs = [factory(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objs
+    return size / count
+
+
+def bench_memory(count: int):
+    """ Bytes per object with and without slots
+    """
+    emails = ["user{}@example.com".format(i) for i in range(count)]
+    user_ids = [str(uuid.uuid4()) for _ in range(count // 10 + 1)]
+
+    def sessions(klass):
+        # JSON parsing gives each session its own copy of the user id
+        return lambda i: klass(user_id=str(uuid.UUID(user_ids[i // 10])),
+                               session_id=str(uuid.uuid4()))
+
+    cases = (
+        ("User", lambda i: DictUser(email=emails[i]),
+         lambda i: User(email=emails[i])),
+        ("UserSession", sessions(DictUserSession), sessions(UserSession)),
+    )
+    for name, before, after in cases:
+        size_before = bytes_per_object(before, count)
+        size_after = bytes_per_object(after, count)
+        print("{:>12}: {:.0f} B/object before, {:.0f} B/object after"
+              .format(name, size_before, size_after))
+
+
+def bench_timestamps(count: int):
+    """ Timestamp parsing and formatting against strptime/strftime
+    """
+    seconds = [1700000000 + 997 * i for i in range(count)]
+    strings = [format_timestamp(s) for s in seconds]
+    assert [parse_timestamp(s) for s in strings] == seconds
+    assert strings == [datetime.utcfromtimestamp(s).strftime(
+        TIMESTAMP_FORMAT) for s in seconds]
+
+    cases = (
+        ("parse",
+         lambda: [int((datetime.strptime(s, TIMESTAMP_FORMAT) - EPOCH)
+                      .total_seconds()) for s in strings],
+         lambda: [parse_timestamp(s) for s in strings]),
+        ("format",
+         lambda: [datetime.utcfromtimestamp(s).strftime(TIMESTAMP_FORMAT)
+                  for s in seconds],
+         lambda: [format_timestamp(s) for s in seconds]),
+    )
+    for name, before, after in cases:
+        time_before = min(timeit.repeat(before, number=1, repeat=3))
+        time_after = min(timeit.repeat(after, number=1, repeat=3))
+        print("{:>12}: {:.0f} ns before, {:.0f} ns after ({:.1f}x)".format(
+            name, time_before / count * 1e9, time_after / count * 1e9,
+            time_before / time_after))
+        assert time_after < time_before, "{} got slower".format(name)
+
+
+def bench_snapshots(count: int):
+    """ Save time, load time and file size of each snapshot format, for
+    `count` users with 5 sessions each
+    """
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        users = [User(email="user{}@example.com".format(i), first_name="Bob",
+                      _password=uuid.uuid4().hex) for i in range(count)]
+        sessions = [UserSession(user_id=users[i // 5].id,
+                                session_id=str(uuid.uuid4()))
+                    for i in range(5 * count)]
+        for cls, objs in ((User, users), (UserSession, sessions)):
+            for snapshot_format in ("json", "indexed", "columnar"):
+                cls.SNAPSHOT_FORMAT = snapshot_format
+                DATA[cls.__name__] = {obj.id: obj for obj in objs}
+                start = time.perf_counter()
+                cls.save_to_file()
+                saved = time.perf_counter()
+                cls.load_from_file()
+                loaded = time.perf_counter()
+                # indexed files are parsed on first access
+                for obj in cls.all():
+                    pass
+                accessed = time.perf_counter()
+                size = os.path.getsize(cls._snapshot_path())
+                assert cls.count() == len(objs)
+                print("{:>12} {:>8}: save {:.3f}s, load {:.3f}s "
+                      "(+{:.3f}s to access all), {:.1f} MB".format(
+                          cls.__name__, snapshot_format, saved - start,
+                          loaded - saved, accessed - loaded, size / 1e6))
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    bench_memory(count)
+    bench_timestamps(count)
+    bench_snapshots(count)
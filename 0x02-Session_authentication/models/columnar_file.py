@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+""" Columnar file module
+
+Layout of a columnar snapshot file:
+    MAGIC, then the length of the header as a little-endian uint32
+    header: {"rows": n, "strings": size, "columns": [[name, kind, size],
+             ...]} in JSON
+    string table: JSON list of the distinct strings
+    one array per column, in order
+
+Column kinds:
+    "S": strings or None, uint32 references to the string table (0 is
+         None, i is the string i - 1)
+    "I": integers, int64
+    "J": any JSON value, uint32 references to its JSON text in the
+         string table
+
+Repeated values (e.g. the user_id of the sessions of a user) are stored
+once, and integers (e.g. timestamps) are read as whole arrays instead of
+being parsed one by one.
+"""
+from array import array
+from typing import List, Sequence, Tuple
+import json
+import struct
+import sys
+
+
+MAGIC = b"MCOL"
+LENGTH = struct.Struct("<I")
+INT_MIN, INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _kind(values: Sequence) -> str:
+    """ Kind of a column of values
+    """
+    if all(type(v) is str or v is None for v in values):
+        return "S"
+    if all(type(v) is int and INT_MIN <= v <= INT_MAX for v in values):
+        return "I"
+    return "J"
+
+
+def _to_bytes(values: array) -> bytes:
+    """ Little-endian bytes of an array
+    """
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    """ Array of little-endian bytes
+    """
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def write_columnar_file(file_path: str, names: Sequence[str],
+                        columns: Sequence[list]):
+    """ Write columns of equal length, named by `names`, to `file_path`
+    """
+    # string -> reference, in insertion order
+    refs = {}
+    payloads = []
+    header_columns = []
+    for name, values in zip(names, columns):
+        kind = _kind(values)
+        if kind == "S":
+            payload = _to_bytes(array('I', [
+                0 if v is None else refs.setdefault(v, len(refs) + 1)
+                for v in values]))
+        elif kind == "I":
+            payload = _to_bytes(array('q', values))
+        else:
+            payload = _to_bytes(array('I', [
+                refs.setdefault(json.dumps(v), len(refs) + 1)
+                for v in values]))
+        payloads.append(payload)
+        header_columns.append([name, kind, len(payload)])
+
+    strings = json.dumps(list(refs)).encode()
+    rows = len(columns[0]) if len(columns) > 0 else 0
+    header = json.dumps({'rows': rows, 'strings': len(strings),
+                         'columns': header_columns}).encode()
+    with open(file_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(strings)
+        for payload in payloads:
+            f.write(payload)
+
+
+def read_columnar_file(file_path: str) -> Tuple[List[str], List[list]]:
+    """ Return the names and the columns of `file_path`
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a columnar file: {}".format(file_path))
+    offset = len(MAGIC) + LENGTH.size
+    size, = LENGTH.unpack_from(data, len(MAGIC))
+    header = json.loads(data[offset:offset + size])
+    offset += size
+    strings = [None]
+    strings.extend(json.loads(data[offset:offset + header['strings']]))
+    offset += header['strings']
+
+    names = []
+    columns = []
+    for name, kind, size in header['columns']:
+        payload = data[offset:offset + size]
+        offset += size
+        if kind == "S":
+            values = list(map(strings.__getitem__,
+                              _from_bytes('I', payload)))
+        elif kind == "I":
+            values = _from_bytes('q', payload).tolist()
+        else:
+            values = [json.loads(strings[i])
+                      for i in _from_bytes('I', payload)]
+        names.append(name)
+        columns.append(values)
+    return names, columns
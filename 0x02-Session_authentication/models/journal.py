@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+""" Journal module
+"""
+from os import path
+from typing import Iterator, List
+import fcntl
+import json
+import os
+import shutil
+import threading
+
+
+class Journal():
+    """ Append-only log of the mutations of one model class
+
+    Records are JSON lines: {"op": "save", "obj": {...}} or
+    {"op": "remove", "id": "..."}. Replaying them in order over the
+    last snapshot rebuilds the current state, and replaying a record
+    twice is harmless, so the log can be rotated while a compaction
+    writes a new snapshot.
+    """
+
+    def __init__(self, file_path: str, compact_every: int = 1000,
+                 fsync: bool = False):
+        """ Initialize a Journal stored in `file_path`, `fsync` makes
+        appends durable before they return
+        """
+        self.file_path = file_path
+        self.fsync = fsync
+        self.rotated_path = "{}.1".format(file_path)
+        self.compact_every = compact_every
+        self.records = 0
+        # position of the current log read so far, to replay only the
+        # records appended by other processes
+        self.inode = None
+        self.offset = 0
+        # reentrant: models hold it while changing objects and logging them
+        self.lock = threading.RLock()
+        self.compaction_lock = threading.Lock()
+        self._compaction_pending = False
+
+    def append(self, record: dict):
+        """ Append one record to the log
+        """
+        line = "{}\n".format(json.dumps(record)).encode()
+        with self.lock:
+            with self._open_locked() as f:
+                inode = os.fstat(f.fileno()).st_ino
+                size = f.seek(0, os.SEEK_END)
+                f.write(line)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if self.inode is None and size == 0:
+                self.inode = inode
+            if inode == self.inode and size == self.offset:
+                self.offset = size + len(line)
+            self.records += 1
+
+    def _open_locked(self):
+        """ Open the current log for appending, with an exclusive flock
+
+        Other processes append too: without the lock, the size could be
+        read before their write and `offset` would land in the middle of
+        their record. A log rotated while waiting for the lock is closed
+        and the new one opened instead.
+        """
+        while True:
+            f = open(self.file_path, 'ab')
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                if os.fstat(f.fileno()).st_ino == \
+                        os.stat(self.file_path).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            except BaseException:
+                f.close()
+                raise
+            f.close()
+
+    def replay(self) -> Iterator[dict]:
+        """ Yield the records of the rotated log then of the current log
+        """
+        self.inode = None
+        self.offset = 0
+        yield from self._read(self.rotated_path, 0, False)
+        yield from self._read(self.file_path, 0, True)
+
+    def replay_new(self) -> Iterator[dict]:
+        """ Yield the records appended to the current log since it was
+        last read
+        """
+        yield from self._read(self.file_path, self.offset, True)
+
+    def replaced(self) -> bool:
+        """ Return True if the current log was rotated or truncated since
+        it was last read
+        """
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return self.inode is not None
+        if self.inode is None:
+            return self.offset != 0
+        return st.st_ino != self.inode or st.st_size < self.offset
+
+    def grown(self) -> bool:
+        """ Return True if records were appended since the log was last read
+        """
+        try:
+            return os.stat(self.file_path).st_size > self.offset
+        except OSError:
+            return False
+
+    def _read(self, file_path: str, offset: int,
+              track: bool) -> Iterator[dict]:
+        """ Yield the complete records of `file_path` after `offset`
+        """
+        if not path.exists(file_path):
+            return
+        with open(file_path, 'rb') as f:
+            if track:
+                self.inode = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # torn record from an append in progress
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                offset += len(line)
+                if track:
+                    self.offset = offset
+                yield record
+
+    def reserve_compaction(self) -> bool:
+        """ Return True once when the log is long enough to be compacted,
+        until `compacted` is called
+        """
+        with self.lock:
+            if self._compaction_pending or self.compact_every <= 0:
+                return False
+            if self.records < self.compact_every:
+                return False
+            self._compaction_pending = True
+            return True
+
+    def rotate(self) -> List[dict]:
+        """ Move the current log aside before a compaction, and return the
+        records appended to it since it was last read
+
+        Must be called with `lock` held. Appends of other processes wait
+        for the rotation, so the returned records are the last ones of the
+        rotated log. A rotated log left by an interrupted compaction is
+        kept and extended.
+        """
+        records = []
+        if path.exists(self.file_path):
+            with self._open_locked() as f:
+                if os.fstat(f.fileno()).st_ino != self.inode:
+                    self.inode = None
+                    self.offset = 0
+                records = list(self._read(self.file_path, self.offset,
+                                          True))
+                if path.exists(self.rotated_path):
+                    with open(self.file_path, 'rb') as src, \
+                            open(self.rotated_path, 'ab') as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.remove(self.file_path)
+                else:
+                    os.replace(self.file_path, self.rotated_path)
+        self.records = 0
+        self.inode = None
+        self.offset = 0
+        return records
+
+    def compacted(self):
+        """ Drop the rotated log once its records are in a snapshot
+        """
+        if path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+        with self.lock:
+            self._compaction_pending = False
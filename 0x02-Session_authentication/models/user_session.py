@@ -2,14 +2,20 @@
 """ User session module
 """
 from models.base import Base
+import sys
 
 
 class UserSession(Base):
     """User Session Class
     """
+    __slots__ = ('user_id', 'session_id')
+    INDEXED_ATTRIBUTES = ('session_id',)
 
     def __init__(self, *args: list, **kwargs: dict):
         """Constructor Method"""
         super().__init__(*args, **kwargs)
-        self.user_id = kwargs.get('user_id')
+        user_id = kwargs.get('user_id')
+        # shared by all the sessions of a user
+        self.user_id = sys.intern(user_id) if type(user_id) is str \
+            else user_id
         self.session_id = kwargs.get('session_id')
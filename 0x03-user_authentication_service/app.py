@@ -4,6 +4,7 @@
 
 from auth import Auth
 from flask import Flask, jsonify, request, abort, redirect
+from hasher import HasherBusyError
 import logging
 
 logging.disable(logging.WARNING)
@@ -12,6 +13,23 @@ AUTH = Auth()
 app = Flask(__name__)
 
 
+@app.errorhandler(HasherBusyError)
+def service_busy(error) -> str:
+    """Password hashing queue is full
+    Return:
+      - JSON payload: {"message": "service busy"} with a 503 status
+    """
+    response = jsonify({"message": "service busy"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
+@app.teardown_appcontext
+def close_db_session(exception=None) -> None:
+    """Release the database session used by the request"""
+    AUTH.close_db_session()
+
+
 @app.route('/', methods=['GET'], strict_slashes=False)
 def hello() -> str:
     """GET /
@@ -3,7 +3,9 @@
 
 import bcrypt
 from db import DB
+from hasher import HasherBusyError, PasswordHasher
 from user import User
+import os
 import uuid
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import InvalidRequestError
@@ -14,6 +16,15 @@ class Auth:
 
     def __init__(self):
         self._db = DB()
+        self._hasher = PasswordHasher(
+            max_workers=_env_int("HASH_WORKERS"),
+            queue_size=_env_int("HASH_QUEUE_SIZE"),
+            rounds=_env_int("BCRYPT_ROUNDS"),
+        )
+
+    def close_db_session(self) -> None:
+        """Release the database session of the current thread."""
+        self._db.close_session()
 
     def register_user(self, email: str, password: str) -> User:
         """Register a new user with hashed password.
@@ -27,12 +38,13 @@ class Auth:
 
         Raises:
             ValueError: If a user with the given email already exists.
+            HasherBusyError: If the password hashing queue is full.
         """
         try:
             self._db.find_user_by(email=email)
             raise ValueError(f"User {email} already exists")
         except NoResultFound:
-            hashed_password = self._hash_password(password)
+            hashed_password = self._hasher.hash(password)
             new_user = self._db.add_user(email=email,
                                          hashed_password=hashed_password)
             return new_user
@@ -42,16 +54,32 @@ class Auth:
     def valid_login(self, email: str, password: str) -> bool:
         """Check if the provided password matches the hashed password in the
         database.
+
+        A matching password stored with another bcrypt work factor than
+        the configured one (BCRYPT_ROUNDS) is hashed again and saved, so
+        the cost can be changed without a mass migration.
+
+        Raises:
+            HasherBusyError: If the password hashing queue is full.
         """
         try:
             user = self._db.find_user_by(email=email)
-            if user:
-                return bcrypt.checkpw(password.encode('utf-8'),
-                                      user.hashed_password)
+            if not user:
+                return False
+            valid = self._hasher.check(password, user.hashed_password)
+        except HasherBusyError:
+            raise
         except Exception:
             return False
 
-        return False
+        if valid and self._hasher.needs_rehash(user.hashed_password):
+            try:
+                self._db.update_user(
+                    user.id, hashed_password=self._hasher.hash(password))
+            except Exception:
+                # the login is valid, the rehash can wait for the next one
+                pass
+        return valid
 
     def create_session(self, email: str) -> str:
         """Creates a session and returns the session ID as a string.
@@ -62,14 +90,9 @@ class Auth:
         Returns:
             str: Session ID.
         """
-        try:
-            user = self._db.find_user_by(email=email)
-        except NoResultFound:
-            return None
-        if user is None:
-            return None
         session_id = _generate_uuid()
-        self._db.update_user(user.id, session_id=session_id)
+        if self._db.update_user_by_email(email, session_id=session_id) == 0:
+            return None
         return session_id
 
     def get_user_from_session_id(self, session_id: str) -> User:
@@ -117,14 +140,10 @@ class Auth:
             str: A string representing the password reset token generated for
             the user.
         """
-        try:
-            user = self._db.find_user_by(email=email)
-        except NoResultFound:
-            user = None
-        if user is None:
-            raise ValueError()
         reset_token = _generate_uuid()
-        self._db.update_user(user.id, reset_token=reset_token)
+        if self._db.update_user_by_email(email,
+                                         reset_token=reset_token) == 0:
+            raise ValueError()
         return reset_token
 
     def update_password(self, reset_token: str, password: str) -> None:
@@ -137,6 +156,7 @@ class Auth:
         Raises:
             ValueError: If the reset token is invalid (i.e., not associated
             with a user)..
+            HasherBusyError: If the password hashing queue is full.
 
         Returns:
             None
@@ -145,7 +165,7 @@ class Auth:
             user = self._db.find_user_by(reset_token=reset_token)
         except NoResultFound:
             raise ValueError("Invalid reset token")
-        new_hashed_password = _hash_password(password)
+        new_hashed_password = self._hasher.hash(password)
         self._db.update_user(
             user.id,
             hashed_password=new_hashed_password,
@@ -156,11 +176,22 @@ class Auth:
 def _hash_password(password: str) -> bytes:
     """Hashes a password using bcrypt."""
     import bcrypt
-    salt = bcrypt.gensalt()
+    rounds = _env_int("BCRYPT_ROUNDS")
+    salt = bcrypt.gensalt() if rounds is None else bcrypt.gensalt(rounds)
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed_password
 
 
+def _env_int(name: str) -> int:
+    """Read an integer setting from the environment, None if unset or
+    invalid.
+    """
+    try:
+        return int(os.getenv(name))
+    except (TypeError, ValueError):
+        return None
+
+
 def _generate_uuid() -> str:
     """
     Generate and return a new UUID as a string.
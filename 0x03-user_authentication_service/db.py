@@ -3,35 +3,90 @@
 
 """DB module
 """
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine.url import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.orm.session import Session
+from sqlalchemy.pool import QueuePool, StaticPool
 from user import User, Base
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
 
 
 class DB:
     """DB class
     """
 
-    def __init__(self) -> None:
+    def __init__(self, url: str = None,
+                 pool_size: int = None, max_overflow: int = None,
+                 pool_pre_ping: bool = None,
+                 sqlite_wal: bool = None, reset: bool = None) -> None:
         """Initialize a new DB instance
+
+        Args:
+            url (str): SQLAlchemy database URL
+            (DB_URL, default sqlite:///a.db).
+            pool_size (int): Connections kept open in the pool
+            (DB_POOL_SIZE, default 5).
+            max_overflow (int): Extra connections opened under load
+            (DB_MAX_OVERFLOW, default 10).
+            pool_pre_ping (bool): Check connections before handing them out
+            (DB_POOL_PRE_PING, default on).
+            sqlite_wal (bool): Put a file-backed SQLite database in WAL mode
+            so readers don't block the writer (DB_SQLITE_WAL, default off).
+            reset (bool): Drop all tables and their data before creating
+            them (DB_RESET, default off). Otherwise existing data is kept
+            and only missing tables and indexes are created.
         """
-        self._engine = create_engine("sqlite:///a.db", echo=False)
-        Base.metadata.drop_all(self._engine)
-        Base.metadata.create_all(self._engine)
-        self.__session = None
+        if url is None:
+            url = os.getenv("DB_URL", "sqlite:///a.db")
+        if pool_size is None:
+            pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        if max_overflow is None:
+            max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        if pool_pre_ping is None:
+            pool_pre_ping = _env_flag("DB_POOL_PRE_PING", True)
+        if sqlite_wal is None:
+            sqlite_wal = _env_flag("DB_SQLITE_WAL", False)
+        if reset is None:
+            reset = _env_flag("DB_RESET", False)
+
+        db_url = make_url(url)
+        is_sqlite = db_url.get_backend_name() == "sqlite"
+        in_memory = is_sqlite and db_url.database in (None, "", ":memory:")
+        engine_args = {"echo": False, "pool_pre_ping": pool_pre_ping}
+        if is_sqlite:
+            # pooled connections are handed to any worker thread
+            engine_args["connect_args"] = {"check_same_thread": False}
+        if in_memory:
+            # every connection would otherwise get its own empty database
+            engine_args["poolclass"] = StaticPool
+        else:
+            engine_args["poolclass"] = QueuePool
+            engine_args["pool_size"] = pool_size
+            engine_args["max_overflow"] = max_overflow
+        self._engine = create_engine(url, **engine_args)
+        if is_sqlite and sqlite_wal and not in_memory:
+            event.listen(self._engine, "connect", _set_sqlite_wal)
+
+        if reset:
+            Base.metadata.drop_all(self._engine)
+        upgrade_schema(self._engine)
+        self.__session = scoped_session(sessionmaker(bind=self._engine))
 
     @property
     def _session(self) -> Session:
-        """Memoized session object
+        """Session object of the current thread
         """
-        if self.__session is None:
-            DBSession = sessionmaker(bind=self._engine)
-            self.__session = DBSession()
-        return self.__session
+        return self.__session()
+
+    def close_session(self) -> None:
+        """Close the session of the current thread and return its
+        connection to the pool
+        """
+        self.__session.remove()
 
     def add_user(self, email: str, hashed_password: str) -> User:
         """Add a new user to the database.
@@ -42,11 +97,19 @@ class DB:
 
         Returns:
             User: The newly created User object.
+
+        Raises:
+            ValueError: If a user with the given email already exists,
+            e.g. added by another request since it was looked up.
         """
         new_user = User(email=email, hashed_password=hashed_password)
         session = self._session
         session.add(new_user)
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            raise ValueError(f"User {email} already exists")
         return new_user
 
     def find_user_by(self, **kwargs) -> User:
@@ -73,7 +136,7 @@ class DB:
         except InvalidRequestError as e:
             raise InvalidRequestError(f"Invalid request: {e}")
 
-    def update_user(self, user_id: int, **kwargs) -> None:
+    def update_user(self, user_id: int, **kwargs) -> int:
         """Update a user's attributes.
 
         Args:
@@ -81,16 +144,85 @@ class DB:
             **kwargs: Arbitrary keyword arguments corresponding to the user's
             attributes to update.
 
+        Returns:
+            int: The number of users updated (0 if no user has this ID).
+
+        Raises:
+            ValueError: If any argument does not correspond to a user attribut.
+        """
+        return self._update_users({"id": user_id}, kwargs)
+
+    def update_user_by_email(self, email: str, **kwargs) -> int:
+        """Update the attributes of the user with the given email.
+
+        Args:
+            email (str): The email of the user to update.
+            **kwargs: Arbitrary keyword arguments corresponding to the user's
+            attributes to update.
+
+        Returns:
+            int: The number of users updated (0 if no user has this email).
+
         Raises:
             ValueError: If any argument does not correspond to a user attribut.
         """
+        return self._update_users({"email": email}, kwargs)
+
+    def _update_users(self, criteria: dict, values: dict) -> int:
+        """Run a single UPDATE ... WHERE statement on the users table,
+        without loading the matching users first.
+        """
+        columns = User.__table__.columns
+        for key in values:
+            if key not in columns:
+                raise ValueError(
+                    f"Attribute '{key}' is not a valid attribute of the "
+                    "User class")
         session = self._session
-        user = self.find_user_by(id=user_id)
+        try:
+            updated = session.query(User).filter_by(**criteria).update(
+                values, synchronize_session="evaluate")
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return updated
+
+
+def upgrade_schema(engine) -> None:
+    """Create the tables and indexes missing from an existing database,
+    keeping its data
+
+    Raises:
+        IntegrityError: If existing rows break a unique index (e.g. two
+        users with the same email).
+    """
+    Base.metadata.create_all(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a boolean setting from the environment
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _set_sqlite_wal(dbapi_connection, connection_record) -> None:
+    """Enable WAL journaling on a new SQLite connection
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
 
-        for key, value in kwargs.items():
-            if not hasattr(user, key):
-                raise ValueError
-            (f"Attribute '{key}' is not a valid attribute of the User class")
-            setattr(user, key, value)
 
-        session.commit()
+if __name__ == "__main__":
+    import sys
+    url = sys.argv[1] if len(sys.argv) > 1 else \
+        os.getenv("DB_URL", "sqlite:///a.db")
+    upgrade_schema(create_engine(url))
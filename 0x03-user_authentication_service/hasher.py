@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Password hashing service module
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import bcrypt
+
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 4
+MAX_ROUNDS = 20
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class PasswordHasher:
+    """Runs bcrypt hashes on a bounded pool of worker threads.
+
+    bcrypt releases the GIL while hashing, so threads run hashes in
+    parallel. At most `max_workers + queue_size` hashes are running or
+    waiting; submitting more raises HasherBusyError instead of letting
+    requests pile up behind slow hashes.
+    """
+
+    def __init__(self, max_workers: int = None, queue_size: int = None,
+                 rounds: int = None):
+        """Initialize the pool.
+
+        Args:
+            max_workers (int): Number of hashing threads, defaults to the
+            number of CPUs.
+            queue_size (int): Number of hashes allowed to wait for a
+            thread, defaults to 4 per thread.
+            rounds (int): bcrypt work factor of new hashes, defaults to
+            DEFAULT_ROUNDS.
+        """
+        if rounds is None:
+            rounds = DEFAULT_ROUNDS
+        self.rounds = rounds
+        if max_workers is None or max_workers <= 0:
+            max_workers = os.cpu_count() or 1
+        if queue_size is None or queue_size < 0:
+            queue_size = 4 * max_workers
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="hasher")
+
+    def _submit(self, fn, *args) -> Future:
+        """Run `fn(*args)` on the pool.
+
+        Raises:
+            HasherBusyError: If all threads and queue slots are taken.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusyError("Password hashing queue is full")
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit_hash(self, password: str) -> Future:
+        """Hash a password on the pool.
+
+        Returns:
+            Future: Resolves to the salted hash (bytes).
+        """
+        return self._submit(_hashpw, password, self.rounds)
+
+    def submit_check(self, password: str, hashed_password: bytes) -> Future:
+        """Check a password against its hash on the pool.
+
+        Returns:
+            Future: Resolves to True if the password matches.
+        """
+        return self._submit(_checkpw, password, hashed_password)
+
+    def hash(self, password: str) -> bytes:
+        """Hash a password, waiting for the result."""
+        return self.submit_hash(password).result()
+
+    def check(self, password: str, hashed_password: bytes) -> bool:
+        """Check a password against its hash, waiting for the result."""
+        return self.submit_check(password, hashed_password).result()
+
+    async def hash_async(self, password: str) -> bytes:
+        """Hash a password without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit_hash(password))
+
+    async def check_async(self, password: str,
+                          hashed_password: bytes) -> bool:
+        """Check a password without blocking the event loop."""
+        return await asyncio.wrap_future(
+            self.submit_check(password, hashed_password))
+
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        """Check if a hash was made with another work factor than
+        `rounds`.
+        """
+        return hash_rounds(hashed_password) != self.rounds
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=wait)
+
+
+def hash_rounds(hashed_password: bytes) -> int:
+    """Work factor of a bcrypt hash ($2b$<rounds>$...), None if it
+    can't be read.
+    """
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode('utf-8')
+    try:
+        return int(hashed_password.split(b"$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(target_seconds: float = 0.25,
+                     min_rounds: int = MIN_ROUNDS,
+                     max_rounds: int = MAX_ROUNDS) -> int:
+    """Find the highest work factor whose hash takes at most
+    `target_seconds` on this machine.
+
+    Each extra round doubles the cost, so rounds are timed upward from
+    `min_rounds` until one goes over the target.
+
+    Returns:
+        int: The chosen work factor, at least `min_rounds`.
+    """
+    rounds = min_rounds
+    while rounds < max_rounds:
+        salt = bcrypt.gensalt(rounds=rounds + 1)
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration", salt)
+        if time.perf_counter() - start > target_seconds:
+            break
+        rounds += 1
+    return rounds
+
+
+def _hashpw(password: str, rounds: int = DEFAULT_ROUNDS) -> bytes:
+    """Hashes a password using bcrypt."""
+    return bcrypt.hashpw(password.encode('utf-8'),
+                         bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password: str, hashed_password: bytes) -> bool:
+    """Checks a password against a bcrypt hash."""
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+
+if __name__ == "__main__":
+    import sys
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 0.25
+    print("BCRYPT_ROUNDS={}".format(calibrate_rounds(target)))
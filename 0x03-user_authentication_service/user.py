@@ -14,10 +14,10 @@ class User(Base):
     __tablename__ = 'users'
 
     id = Column(Integer, primary_key=True)
-    email = Column(String, nullable=False)
+    email = Column(String, nullable=False, unique=True, index=True)
     hashed_password = Column(String, nullable=False)
-    session_id = Column(String, nullable=True)
-    reset_token = Column(String, nullable=True)
+    session_id = Column(String, nullable=True, unique=True, index=True)
+    reset_token = Column(String, nullable=True, unique=True, index=True)
 
     def __init__(self, email: str, hashed_password: str,
                  session_id: Optional[str] = None,